@@ -1,10 +1,12 @@
 import streamlit as st
-import os
-from components.game_ui import create_sidebar, render_game_over, render_game_ui
-from components.hand_tracker import start_camera
+from components.game_ui import create_sidebar, get_board_store, get_render_cache, render_game_over, render_game_ui
+from components.tracker_warmup import warm_up_tracker
 from game.game_logic import initialize_game, check_tile_placement, update_game_state
-from game.puzzle_generator import get_available_images, create_puzzle
-from utils.config import TITLE, INSTRUCTIONS, GAME_MODES
+from game.image_library import get_image_library
+from game.puzzle_pool import get_puzzle_pool
+from utils.helpers import load_css
+from utils.metrics import get_metrics
+from utils.config import TITLE, INSTRUCTIONS, GAME_MODES, MISSING_TILES
 
 # Configure Streamlit page
 st.set_page_config(
@@ -14,11 +16,22 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Apply custom CSS
-with open(os.path.join("assets", "styles", "main.css")) as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Apply custom CSS, read from disk once per process
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
 def main():
+    # Time the page itself, the camera loop below keeps running until the next rerun
+    with get_metrics().rerun():
+        game_rendered = render_page()
+    
+    # Run the camera under the board of an active game
+    if game_rendered:
+        # The tracker and camera stack are only imported once a game starts
+        from components.hand_tracker import start_camera
+        start_camera()
+
+def render_page():
+    # Returns True when an active game was rendered, so the camera can run below it
     # Initialize session state if not exists
     if "game_initialized" not in st.session_state:
         st.session_state.game_initialized = False
@@ -28,10 +41,11 @@ def main():
         st.session_state.score = 0
         st.session_state.attempts = 0
         st.session_state.game_mode = None
-        st.session_state.puzzle_image = None
-        st.session_state.puzzle_tiles = None
-        st.session_state.missing_positions = None
-        st.session_state.shuffled_tiles = None
+        st.session_state.puzzle = None
+        st.session_state.correct_placements = {}
+        st.session_state.game_id = None
+        st.session_state.state_version = 0
+        st.session_state.feedback = None
 
     # Create sidebar UI
     create_sidebar()
@@ -42,21 +56,16 @@ def main():
         st.markdown(INSTRUCTIONS)
         
         # Game mode selection
-        mode_col1, mode_col2, mode_col3 = st.columns(3)
-        with mode_col1:
-            if st.button("8x8 Puzzle", use_container_width=True):
-                st.session_state.game_mode = GAME_MODES[0]
-                start_new_game()
+        mode_columns = st.columns(len(GAME_MODES))
+        for mode_col, mode in zip(mode_columns, GAME_MODES):
+            with mode_col:
+                if st.button(f"{mode} Puzzle", use_container_width=True):
+                    st.session_state.game_mode = mode
+                    start_new_game()
         
-        with mode_col2:
-            if st.button("16x16 Puzzle", use_container_width=True):
-                st.session_state.game_mode = GAME_MODES[1]
-                start_new_game()
-                
-        with mode_col3:
-            if st.button("24x24 Puzzle", use_container_width=True):
-                st.session_state.game_mode = GAME_MODES[2]
-                start_new_game()
+        # Once the page is drawn, generate puzzles and load MediaPipe in the background while a mode is picked
+        get_puzzle_pool()
+        warm_up_tracker()
     
     # Handle game over state
     elif st.session_state.game_over:
@@ -69,32 +78,36 @@ def main():
     # Render active game
     else:
         render_game_ui()
-        start_camera()
+        return True
+    return False
 
 def start_new_game():
-    # Get available images
-    available_images = get_available_images()
-    if not available_images:
+    # Check for images without listing the whole library
+    if len(get_image_library()) == 0:
         st.error("No images found in the assets/images directory!")
         return
     
     # Create puzzle based on selected mode
     mode = st.session_state.game_mode
-    grid_size = int(mode.split('x')[0])
+    missing_tiles = MISSING_TILES[mode]
     
-    # Determine number of missing tiles based on grid size
-    if grid_size == 8:
-        missing_tiles = 3
-    elif grid_size == 16:
-        missing_tiles = 7
-    else:  # 24x24
-        missing_tiles = 10
-        
     # Initialize the game
-    initialize_game(mode, missing_tiles)
+    try:
+        initialize_game(mode, missing_tiles)
+    except ValueError as e:
+        st.error(f"Could not create a {mode} puzzle: {e}")
+        return
     st.session_state.game_initialized = True
+    
+    # Draw the board right away instead of below the mode selection page
+    st.rerun()
 
 def reset_game():
+    # Free the board and encoded images of the finished game
+    if st.session_state.game_id is not None:
+        get_board_store().evict(st.session_state.game_id)
+        get_render_cache().evict_game(st.session_state.game_id)
+    
     st.session_state.game_initialized = False
     st.session_state.game_over = False
     st.session_state.game_won = False
@@ -102,10 +115,11 @@ def reset_game():
     st.session_state.score = 0
     st.session_state.attempts = 0
     st.session_state.game_mode = None
-    st.session_state.puzzle_image = None
-    st.session_state.puzzle_tiles = None
-    st.session_state.missing_positions = None
-    st.session_state.shuffled_tiles = None
+    st.session_state.puzzle = None
+    st.session_state.correct_placements = {}
+    st.session_state.game_id = None
+    st.session_state.state_version = 0
+    st.session_state.feedback = None
     st.rerun()
 
 if __name__ == "__main__":
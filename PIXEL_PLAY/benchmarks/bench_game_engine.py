@@ -0,0 +1,119 @@
+"""Headless simulator for the game engine: generate puzzles and play scripted games.
+
+Plays thousands of games per game mode without Streamlit, to measure puzzle
+generation and placement throughput and to tune SCORING, for example:
+
+    python benchmarks/bench_game_engine.py --games 5000
+    python benchmarks/bench_game_engine.py --accuracy 0.6 --scoring '{"incorrect_placement": -25}'
+    python benchmarks/bench_game_engine.py --seconds-per-move 4 --time-limit 120
+
+Reports puzzles/s, games/s and placements/s, and the final score
+distribution per mode.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import engine
+from game.image_library import get_image_library
+from game.puzzle_generator import create_puzzle
+from utils.config import GAME_MODES, MISSING_TILES, SCORING
+from utils.patterns import write_pattern_images
+
+def benchmark_images(count=4):
+    """Images of the library, or a few generated pattern images if it is empty."""
+    library = get_image_library()
+    paths = list(library.paths())
+    if paths:
+        return paths
+    directory = tempfile.mkdtemp(prefix="pixel_play_bench_")
+    return write_pattern_images(directory, count, (256, 256))
+
+def play(state, rng, accuracy, scoring):
+    """Place every tile, each time the right cell with probability `accuracy`."""
+    while not state.game_over:
+        tile_index = rng.choice(engine.remaining_tiles(state))
+        target = state.puzzle.order[tile_index]
+        position = target
+        if rng.random() >= accuracy:
+            wrong = [p for p in engine.open_positions(state.puzzle, state.correct_placements) if p != target]
+            if wrong:
+                position = rng.choice(wrong)
+        engine.place_tile(state, tile_index, position, scoring=scoring)
+
+def simulate_mode(game_mode, games, images, rng, accuracy, scoring, seconds_per_move, time_limit):
+    """Generate and play `games` games of one mode."""
+    grid_size = int(game_mode.split('x')[0])
+    num_missing = MISSING_TILES[game_mode]
+    clock = time.perf_counter
+
+    start = clock()
+    puzzles = [create_puzzle(images[i % len(images)], grid_size, num_missing, seed=rng.getrandbits(32))
+               for i in range(games)]
+    generate_seconds = clock() - start
+
+    start = clock()
+    states = []
+    for puzzle in puzzles:
+        state = engine.new_game(game_mode, puzzle)
+        play(state, rng, accuracy, scoring)
+        states.append(state)
+    play_seconds = clock() - start
+
+    placements = sum(state.attempts for state in states)
+    final_scores = np.array([
+        engine.final_score(state.score, state.attempts, state.attempts * seconds_per_move, time_limit, scoring)
+        for state in states
+    ])
+    return {
+        "games": games,
+        "puzzles_per_s": round(games / generate_seconds, 1) if generate_seconds else 0.0,
+        "games_per_s": round(games / play_seconds, 1) if play_seconds else 0.0,
+        "placements_per_s": round(placements / play_seconds, 1) if play_seconds else 0.0,
+        "mean_attempts": round(placements / games, 2),
+        "score_mean": round(float(final_scores.mean()), 1),
+        "score_p10": float(np.percentile(final_scores, 10)),
+        "score_p50": float(np.percentile(final_scores, 50)),
+        "score_p90": float(np.percentile(final_scores, 90)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=2000, help="games per mode")
+    parser.add_argument("--modes", nargs="+", default=GAME_MODES, choices=GAME_MODES)
+    parser.add_argument("--accuracy", type=float, default=0.8, help="chance that a placement is correct")
+    parser.add_argument("--scoring", help="JSON object overriding SCORING values")
+    parser.add_argument("--seconds-per-move", type=float, default=3.0, help="simulated time per placement")
+    parser.add_argument("--time-limit", type=float, help="time limit in seconds, for the time bonus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    scoring = dict(SCORING)
+    if args.scoring:
+        scoring.update(json.loads(args.scoring))
+
+    rng = random.Random(args.seed)
+    images = benchmark_images()
+    report = {"scoring": scoring, "accuracy": args.accuracy, "modes": {}}
+    for game_mode in args.modes:
+        result = simulate_mode(game_mode, args.games, images, rng, args.accuracy, scoring,
+                               args.seconds_per_move, args.time_limit)
+        report["modes"][game_mode] = result
+        print(f"{game_mode:<6} {result['puzzles_per_s']:>9.1f} puzzles/s {result['games_per_s']:>9.1f} games/s "
+              f"{result['placements_per_s']:>10.1f} placements/s   attempts {result['mean_attempts']:>6.2f}   "
+              f"score p10/p50/p90 {result['score_p10']:.0f}/{result['score_p50']:.0f}/{result['score_p90']:.0f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Headless throughput benchmark for hand tracking and the pinch/drag logic.
+
+Runs without a webcam on CI boxes, for example:
+
+    python benchmarks/bench_hand_tracker.py --source "../VISIONARY TRACKER/models/outputs"
+    python benchmarks/bench_hand_tracker.py --trace recorded.jsonl
+    python benchmarks/bench_hand_tracker.py            # synthetic pinch/drag trace
+
+Reports frames/s, CPU time and p50/p99 latency per stage, and allocated bytes per
+frame.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.frame_sources import (
+    LandmarkTraceSource, LandmarkTraceWriter, ReplayTracker, open_frame_source
+)
+from components.hand_tracker import GestureController, HandTracker, THUMB_TIP
+from components.image_processor import select_missing_tiles
+from components.layout_index import TrayGeometry
+from game import engine
+from game.puzzle_generator import PuzzleDescriptor
+from utils.config import CAMERA_CONFIG, HAND_TRACKING, TRAY_CONFIG
+
+STAGES = ["read", "detect", "annotate", "gestures"]
+
+def make_game_state(grid_size, num_missing, seed=0):
+    """Build a pixel-free game state for the gesture logic to act on."""
+    rng = random.Random(seed)
+    positions = range(grid_size * grid_size)
+    missing_positions = select_missing_tiles(positions, num_missing, grid_size, rng=rng)
+    order = list(missing_positions)
+    rng.shuffle(order)
+    puzzle = PuzzleDescriptor("benchmark", None, grid_size, seed, missing_positions,
+                              order, [0] * len(order))
+    return engine.GameState(f"{grid_size}x{grid_size}", puzzle, game_id="benchmark")
+
+def reset_game_state(state):
+    """Make every tile available again so the trace can keep playing."""
+    state.correct_placements = {}
+    state.state_version += 1
+    state.game_over = False
+    state.game_won = False
+
+def make_hand(x, y, pinched):
+    """Landmarks with the index tip at (x, y) and the thumb pinched or open."""
+    landmarks = np.tile(np.array([x, y, 0.0], dtype=np.float32), (21, 1))
+    landmarks[THUMB_TIP, 0] += 0.01 if pinched else 0.2
+    return landmarks
+
+def synthesize_trace(state, hold_frames=3, drag_frames=4):
+    """Pinch each tile in the tray, drag it to its board cell and release it."""
+    grid_size = int(state.game_mode.split('x')[0])
+    trace = []
+    remaining = len(state.puzzle)
+    for pos in state.puzzle.order:
+        # Placed tiles leave the tray, so the next tile is always in the first slot
+        x1, y1, x2, y2 = TrayGeometry(range(remaining), TRAY_CONFIG["max_rows"]).slot_rect(0)
+        tray_x, tray_y = 0.7 + 0.3 * (x1 + x2) / 2, (y1 + y2) / 2
+
+        row, col = pos // grid_size, pos % grid_size
+        board_x, board_y = (col + 0.5) * 0.7 / grid_size, (row + 0.5) / grid_size
+
+        trace += [make_hand(tray_x, tray_y, True) for _ in range(hold_frames)]
+        for step in np.linspace(0, 1, drag_frames):
+            trace.append(make_hand(tray_x + (board_x - tray_x) * step,
+                                   tray_y + (board_y - tray_y) * step, True))
+        trace.append(make_hand(board_x, board_y, False))
+        trace.append(None)
+        remaining -= 1
+    return trace
+
+def summarize(samples, frames, elapsed, cpu):
+    """Turn per-stage samples into fps and latency percentiles."""
+    report = {
+        "frames": frames,
+        "fps": round(frames / elapsed, 1) if elapsed else 0.0,
+        # Process CPU time covers MediaPipe's own worker threads as well
+        "cpu_ms_per_frame": round(cpu * 1000 / frames, 2) if frames else 0.0,
+        "stages": {},
+    }
+    for stage in STAGES:
+        values = np.array(samples[stage]) * 1000
+        if values.size:
+            report["stages"][stage] = {
+                "p50_ms": round(float(np.percentile(values, 50)), 3),
+                "p99_ms": round(float(np.percentile(values, 99)), 3),
+            }
+    return report
+
+def run_frames(source, tracker, gestures, state, frames):
+    """Run the tracker and the gesture logic over `frames` source frames."""
+    samples = {stage: [] for stage in STAGES}
+    clock = time.perf_counter
+    start = clock()
+    cpu_start = time.process_time()
+    for _ in range(frames):
+        t0 = clock()
+        ret, frame = source.read()
+        if not ret:
+            break
+        t1 = clock()
+        frame, landmarks = tracker.detect(frame)
+        t2 = clock()
+        tracker.annotate(frame, landmarks)
+        t3 = clock()
+        if landmarks is not None:
+            gestures.update(landmarks, frame.shape)
+        if state.game_over:
+            reset_game_state(state)
+        t4 = clock()
+
+        samples["read"].append(t1 - t0)
+        samples["detect"].append(t2 - t1)
+        samples["annotate"].append(t3 - t2)
+        samples["gestures"].append(t4 - t3)
+    return samples, len(samples["read"]), clock() - start, time.process_time() - cpu_start
+
+def measure_allocations(source, tracker, gestures, state, frames):
+    """Average peak bytes allocated per frame and live blocks left behind."""
+    tracemalloc.start()
+    peaks = []
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(frames):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        ret, frame = source.read()
+        if not ret:
+            break
+        frame, landmarks = tracker.detect(frame)
+        tracker.annotate(frame, landmarks)
+        if landmarks is not None:
+            gestures.update(landmarks, frame.shape)
+        if state.game_over:
+            reset_game_state(state)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - current)
+    tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+    return {
+        "bytes_per_frame": int(np.mean(peaks)) if peaks else 0,
+        "leaked_blocks_per_frame": round((blocks_after - blocks_before) / max(1, len(peaks)), 2),
+    }
+
+def open_benchmark_source(args, state):
+    """Pick the frame source and tracker from the command line arguments."""
+    if args.source is not None:
+        source = open_frame_source(args.source)
+        tracker = HandTracker()
+    else:
+        trace_path = args.trace
+        if trace_path is None:
+            # Write a synthetic trace so the replay path is the same as for recordings
+            trace_path = args.write_trace
+            if trace_path is None:
+                trace_path = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False).name
+            writer = LandmarkTraceWriter(trace_path)
+            for landmarks in synthesize_trace(state):
+                writer.write(landmarks)
+            writer.close()
+        source = LandmarkTraceSource(trace_path)
+        tracker = ReplayTracker(source)
+
+    source.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_CONFIG["width"])
+    source.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_CONFIG["height"])
+    return source, tracker
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", help="video file, image directory or glob run through MediaPipe")
+    parser.add_argument("--trace", help="recorded .jsonl landmark trace to replay")
+    parser.add_argument("--write-trace", help="where to save the synthetic trace")
+    parser.add_argument("--mode", default="24x24", help="game mode for the gesture logic")
+    parser.add_argument("--missing", type=int, default=10, help="missing tiles in the game state")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    grid_size = int(args.mode.split('x')[0])
+    state = make_game_state(grid_size, args.missing)
+    gestures = GestureController(HAND_TRACKING["pinch_threshold"], state=state)
+    source, tracker = open_benchmark_source(args, state)
+    if not source.isOpened():
+        parser.error("Could not open the frame source")
+
+    run_frames(source, tracker, gestures, state, args.warmup)
+    samples, frames, elapsed, cpu = run_frames(source, tracker, gestures, state, args.frames)
+    report = summarize(samples, frames, elapsed, cpu)
+    report["allocations"] = measure_allocations(source, tracker, gestures, state, min(100, args.frames))
+    report["placements"] = state.attempts
+    if hasattr(tracker, "mode_counts"):
+        # How often the adaptive tracker ran or skipped inference
+        report["inference_modes"] = dict(tracker.mode_counts)
+    source.release()
+    tracker.close()
+
+    print(f"{report['frames']} frames, {report['fps']} frames/s, {report['cpu_ms_per_frame']} ms CPU/frame, "
+          f"{report['placements']} placements")
+    for stage, values in report["stages"].items():
+        print(f"  {stage:<9} p50 {values['p50_ms']:>8.3f} ms   p99 {values['p99_ms']:>8.3f} ms")
+    print(f"  allocated {report['allocations']['bytes_per_frame']} bytes/frame, "
+          f"{report['allocations']['leaked_blocks_per_frame']} blocks/frame retained")
+    if "inference_modes" in report:
+        print("  inference " + ", ".join(f"{mode}: {count}" for mode, count in report["inference_modes"].items()))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
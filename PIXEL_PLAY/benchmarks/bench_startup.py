@@ -0,0 +1,86 @@
+"""Cold start benchmark: time to first paint of the mode selection screen.
+
+Every run starts a fresh Python process, like a container scaled up from
+zero, and runs app.py once with Streamlit's AppTest harness:
+
+    python benchmarks/bench_startup.py --runs 5
+
+Reports the Streamlit import, the first script run (imports, asset loading
+and the mode selection page), a warm rerun and how long the background
+MediaPipe warm-up took after the first paint.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the fresh process and prints one JSON line
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file("app.py", default_timeout=120)
+app.run()
+painted = time.perf_counter()
+app.run()
+rerun = time.perf_counter()
+
+warmup_time = None
+warmup = sys.modules.get("components.tracker_warmup")
+thread = getattr(warmup, "_warmup_thread", None)
+if thread is not None:
+    thread.join()
+    warmup_time = time.perf_counter() - painted
+print(json.dumps({
+    "streamlit_import": imported - start,
+    "first_paint": painted - imported,
+    "rerun": rerun - painted,
+    "warmup_after_paint": warmup_time,
+    "tracker_ready": getattr(warmup, "_warm_tracker", None) is not None,
+    "errors": [str(error.value) for error in app.exception],
+}))
+"""
+
+def run_once():
+    """Start the app in a fresh interpreter and return its timings."""
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=PROJECT_DIR, capture_output=True, text=True)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"Startup run failed:\n{result.stderr}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    report = {"runs": runs}
+    for key in ("streamlit_import", "first_paint", "rerun", "warmup_after_paint"):
+        values = [run[key] * 1000 for run in runs if run[key] is not None]
+        if values:
+            report[f"{key}_ms"] = {"p50": round(float(np.percentile(values, 50)), 1),
+                                   "max": round(float(max(values)), 1)}
+
+    print(f"{args.runs} cold starts")
+    for key in ("streamlit_import", "first_paint", "rerun", "warmup_after_paint"):
+        if f"{key}_ms" in report:
+            values = report[f"{key}_ms"]
+            print(f"  {key:<19} p50 {values['p50']:>8.1f} ms   max {values['max']:>8.1f} ms")
+    print(f"  tracker ready after warm-up in {sum(run['tracker_ready'] for run in runs)} of {args.runs} runs")
+    errors = {error for run in runs for error in run["errors"]}
+    for error in errors:
+        print(f"  app error: {error}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,31 @@
-# Import all component modules to make them available
-from components.game_ui import create_sidebar, render_game_over, render_game_ui
-from components.hand_tracker import HandTracker, start_camera
-from components.image_processor import load_and_resize_image, split_image_into_tiles, select_missing_tiles, transform_tile
\ No newline at end of file
+# Component names available from the package, each module is only imported
+# when one of its names is first used so that importing a single component
+# does not load MediaPipe and the camera stack
+import importlib
+
+_EXPORTS = {
+    "create_sidebar": "components.game_ui",
+    "render_game_over": "components.game_ui",
+    "render_game_ui": "components.game_ui",
+    "HandTracker": "components.hand_tracker",
+    "GestureController": "components.hand_tracker",
+    "get_camera_service": "components.hand_tracker",
+    "start_camera": "components.hand_tracker",
+    "CameraService": "components.camera_service",
+    "CameraSubscriber": "components.camera_broker",
+    "load_and_resize_image": "components.image_processor",
+    "split_image_into_tiles": "components.image_processor",
+    "select_missing_tiles": "components.image_processor",
+    "transform_tile": "components.image_processor",
+    "apply_transformation": "components.image_processor",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,178 @@
+import threading
+from collections import OrderedDict
+
+# Colors used to mark a missing tile on the board
+MISSING_FILL = (200, 200, 200)
+MISSING_BORDER = (0, 0, 0)
+BORDER_THICKNESS = 2
+
+class BoardBuffer:
+    """Persistent board image for one game, updated one tile at a time.
+
+    Missing tiles are drawn once when the buffer is created. A placement only
+    restores the pixels of that tile from the puzzle image and bumps
+    `version`, so reruns without a placement do no pixel work at all.
+    """
+
+    def __init__(self, puzzle_image, grid_size, missing_positions, game_id=None,
+                 border_thickness=BORDER_THICKNESS):
+        self.game_id = game_id
+        self.base = puzzle_image
+        self.grid_size = grid_size
+        self.tile_height = puzzle_image.shape[0] // grid_size
+        self.tile_width = puzzle_image.shape[1] // grid_size
+        self.border_thickness = border_thickness
+
+        self.image = puzzle_image.copy()
+        self.open_positions = set(missing_positions)
+        for pos in self.open_positions:
+            self._draw_missing(pos)
+
+        # Incremented on every pixel change
+        self.version = 0
+
+    def cell_rect(self, pos):
+        """Pixel rectangle (x1, y1, x2, y2) of a board position."""
+        row, col = pos // self.grid_size, pos % self.grid_size
+        y1, y2 = row * self.tile_height, (row + 1) * self.tile_height
+        x1, x2 = col * self.tile_width, (col + 1) * self.tile_width
+        return x1, y1, x2, y2
+
+    def dirty_rect(self, pos):
+        """Pixels touched when drawing a missing tile, including its border."""
+        x1, y1, x2, y2 = self.cell_rect(pos)
+        # cv2.rectangle includes the end point and centers the border on the edge
+        pad = self.border_thickness // 2 + 1
+        h, w = self.image.shape[:2]
+        return max(0, x1 - pad), max(0, y1 - pad), min(w, x2 + pad + 1), min(h, y2 + pad + 1)
+
+    def _draw_missing(self, pos):
+        """Draw a gray rectangle to represent a missing tile."""
+        import cv2
+        x1, y1, x2, y2 = self.cell_rect(pos)
+        cv2.rectangle(self.image, (x1, y1), (x2, y2), MISSING_FILL, -1)
+        cv2.rectangle(self.image, (x1, y1), (x2, y2), MISSING_BORDER, self.border_thickness)
+
+    def place(self, pos):
+        """Reveal a correctly placed tile. Returns the dirty rectangle or None."""
+        if pos not in self.open_positions:
+            return None
+        self.open_positions.discard(pos)
+
+        x1, y1, x2, y2 = self.dirty_rect(pos)
+        self.image[y1:y2, x1:x2] = self.base[y1:y2, x1:x2]
+
+        # Redraw neighbouring missing tiles whose border shares the restored pixels
+        row, col = pos // self.grid_size, pos % self.grid_size
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                n_row, n_col = row + d_row, col + d_col
+                if 0 <= n_row < self.grid_size and 0 <= n_col < self.grid_size:
+                    neighbour = n_row * self.grid_size + n_col
+                    if neighbour in self.open_positions:
+                        self._draw_missing(neighbour)
+
+        self.version += 1
+        return x1, y1, x2, y2
+
+    def sync(self, correct_placements):
+        """Apply any placements the buffer has not seen yet."""
+        for pos in correct_placements:
+            if pos in self.open_positions:
+                self.place(pos)
+        return self.image
+
+class BoardPyramid:
+    """The board at several resolutions, kept in step one placement at a time.
+
+    `levels[0]` is the full resolution board. Each smaller level is a
+    BoardBuffer over a downscaled copy of the puzzle image whose size is a
+    whole number of tiles, so every placement is applied to each level as
+    its own small dirty rectangle instead of rescaling the whole board.
+    """
+
+    def __init__(self, puzzle_image, grid_size, missing_positions, game_id=None,
+                 widths=(), min_tile_size=4):
+        import cv2
+        self.game_id = game_id
+        self.full = BoardBuffer(puzzle_image, grid_size, missing_positions, game_id)
+        self.levels = [self.full]
+
+        # Only the part of the image covered by whole tiles is scaled down
+        covered = puzzle_image[:self.full.tile_height * grid_size, :self.full.tile_width * grid_size]
+        for width in sorted(set(widths), reverse=True):
+            tile_width = width // grid_size
+            if tile_width < min_tile_size or tile_width >= self.levels[-1].tile_width:
+                continue
+            scale = tile_width / self.full.tile_width
+            tile_height = max(1, round(self.full.tile_height * scale))
+            base = cv2.resize(covered, (tile_width * grid_size, tile_height * grid_size),
+                              interpolation=cv2.INTER_AREA)
+            self.levels.append(BoardBuffer(
+                base, grid_size, missing_positions, game_id,
+                border_thickness=max(1, round(BORDER_THICKNESS * scale))
+            ))
+
+    @property
+    def version(self):
+        return self.full.version
+
+    def level_for(self, width):
+        """Smallest level at least `width` pixels wide, or the full board."""
+        if width:
+            for level in reversed(self.levels):
+                if level.image.shape[1] >= width:
+                    return level
+        return self.full
+
+    def scale(self, level):
+        """Size of a level relative to the full board."""
+        return level.tile_width / self.full.tile_width
+
+    def place(self, pos):
+        """Reveal a correctly placed tile on every level."""
+        dirty = self.full.place(pos)
+        for level in self.levels[1:]:
+            level.place(pos)
+        return dirty
+
+    def sync(self, correct_placements):
+        """Apply any placements the levels have not seen yet."""
+        for level in self.levels:
+            level.sync(correct_placements)
+        return self.full.image
+
+class BoardStore:
+    """Process-wide board buffers, keyed by game id and bounded in number.
+
+    Sessions only keep their puzzle descriptor. A board evicted here is
+    rebuilt from the descriptor and the placements made so far.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, game_id, build):
+        """Get the board of a game, calling `build()` to create it on a miss."""
+        with self._lock:
+            board = self._entries.get(game_id)
+            if board is not None:
+                self._entries.move_to_end(game_id)
+                return board
+
+        board = build()
+        with self._lock:
+            self._entries[game_id] = board
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return board
+
+    def evict(self, game_id):
+        """Drop the board of a finished game."""
+        with self._lock:
+            self._entries.pop(game_id, None)
+
+    def __len__(self):
+        return len(self._entries)
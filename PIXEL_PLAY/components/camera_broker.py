@@ -0,0 +1,327 @@
+"""Camera broker: one capture and one hand tracker shared by every viewer.
+
+The broker runs as its own process, so Streamlit server processes and
+sessions never open the webcam themselves. It publishes tracked frames and
+landmarks to a ring buffer in shared memory. Each slot is guarded by a
+sequence lock, so subscribers copy frames out without ever blocking the
+broker, and drop any frame the broker rewrote while it was being copied.
+Subscribers start the broker on demand, and it exits once nobody has read
+a frame for a while.
+
+    python -m components.camera_broker --source 0
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+import cv2
+import numpy as np
+from components.frame_pipeline import StageStats
+
+MAGIC = 0x50504342  # "PPCB"
+LANDMARK_COUNT = 21
+
+# Integer header fields
+H_MAGIC, H_WIDTH, H_HEIGHT, H_SLOTS, H_SEQ, H_PID, H_STATE = range(7)
+# Float header fields
+F_BROKER_BEAT, F_READER_BEAT = range(2)
+
+# Broker states
+STARTING, RUNNING, FAILED = range(3)
+
+def _aligned(offset, alignment=64):
+    return (offset + alignment - 1) // alignment * alignment
+
+class FrameRing:
+    """Views over a shared memory ring of frames, landmarks and slot sequence locks.
+
+    A slot's lock is odd while the broker writes it and `2 * seq + 2` once
+    frame `seq` is complete, so a reader can tell whether the frame it
+    copied is still the one it asked for.
+    """
+
+    def __init__(self, shm, width, height, slots):
+        self.shm = shm
+        self.width, self.height, self.slots = width, height, slots
+        buf = shm.buf
+
+        offset = 0
+        self.ints = np.ndarray((8,), np.int64, buf, offset)
+        offset += self.ints.nbytes
+        self.floats = np.ndarray((4,), np.float64, buf, offset)
+        offset = _aligned(offset + self.floats.nbytes)
+        self.locks = np.ndarray((slots,), np.int64, buf, offset)
+        offset = _aligned(offset + self.locks.nbytes)
+        self.info = np.ndarray((slots, 2), np.float64, buf, offset)  # has landmarks, inference ms
+        offset = _aligned(offset + self.info.nbytes)
+        self.landmarks = np.ndarray((slots, LANDMARK_COUNT, 3), np.float32, buf, offset)
+        offset = _aligned(offset + self.landmarks.nbytes)
+        self.frames = np.ndarray((slots, height, width, 3), np.uint8, buf, offset)
+
+    @staticmethod
+    def size(width, height, slots):
+        """Bytes needed for a ring of `slots` frames."""
+        offset = _aligned(8 * 8 + 4 * 8)
+        offset = _aligned(offset + slots * 8)
+        offset = _aligned(offset + slots * 2 * 8)
+        offset = _aligned(offset + slots * LANDMARK_COUNT * 3 * 4)
+        return offset + slots * height * width * 3
+
+    @classmethod
+    def create(cls, name, width, height, slots):
+        """Create the ring, failing with FileExistsError if a broker already owns it."""
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size(width, height, slots))
+        ring = cls(shm, width, height, slots)
+        ring.ints[:] = 0
+        ring.floats[:] = 0
+        ring.locks[:] = 0
+        ring.ints[H_WIDTH], ring.ints[H_HEIGHT], ring.ints[H_SLOTS] = width, height, slots
+        ring.ints[H_PID] = os.getpid()
+        ring.ints[H_STATE] = STARTING
+        ring.floats[F_BROKER_BEAT] = ring.floats[F_READER_BEAT] = time.time()
+        ring.ints[H_MAGIC] = MAGIC
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to an existing ring, raising FileNotFoundError if there is none."""
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Only the broker may unlink the segment, not this process on exit
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        header = np.ndarray((8,), np.int64, shm.buf, 0)
+        if header[H_MAGIC] != MAGIC:
+            del header
+            shm.close()
+            raise FileNotFoundError(f"Shared memory {name} is not a camera ring")
+        width, height, slots = (int(header[H_WIDTH]), int(header[H_HEIGHT]), int(header[H_SLOTS]))
+        del header
+        return cls(shm, width, height, slots)
+
+    def publish(self, frame, landmarks, inference_ms):
+        """Write the next frame into its slot under the slot's sequence lock."""
+        seq = int(self.ints[H_SEQ]) + 1
+        slot = seq % self.slots
+        self.locks[slot] = 2 * seq + 1
+        if frame.shape[:2] != (self.height, self.width):
+            cv2.resize(frame, (self.width, self.height), dst=self.frames[slot])
+        else:
+            self.frames[slot] = frame
+        if landmarks is not None:
+            self.landmarks[slot] = landmarks
+        self.info[slot] = (landmarks is not None, inference_ms)
+        self.locks[slot] = 2 * seq + 2
+        self.ints[H_SEQ] = seq
+        self.floats[F_BROKER_BEAT] = time.time()
+
+    def read(self, seq):
+        """Copy of frame `seq` with its landmarks and inference time, or None if overwritten."""
+        slot = seq % self.slots
+        if self.locks[slot] != 2 * seq + 2:
+            return None
+        frame = self.frames[slot].copy()
+        landmarks = self.landmarks[slot].copy() if self.info[slot, 0] else None
+        inference_ms = float(self.info[slot, 1])
+        # The broker may have started rewriting the slot while we copied it
+        if self.locks[slot] != 2 * seq + 2:
+            return None
+        return frame, landmarks, inference_ms
+
+    def close(self):
+        """Drop the views and unmap the segment."""
+        self.ints = self.floats = self.locks = self.info = self.landmarks = self.frames = None
+        self.shm.close()
+
+def unlink_ring(name, broker_pid):
+    """Unlink the ring called `name` only if it still belongs to broker `broker_pid`.
+
+    Segments are found by name, so once a stale ring has been replaced the
+    name refers to the new broker's ring, which must be left alone.
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    header = np.ndarray((8,), np.int64, shm.buf, 0)
+    owned = header[H_MAGIC] == MAGIC and int(header[H_PID]) == broker_pid
+    del header
+    shm.close()
+    if owned:
+        shm.unlink()
+    else:
+        # Keep the resource tracker from unlinking someone else's ring when this process exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return owned
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class CameraSubscriber:
+    """Drop-in replacement for CameraService that reads from the camera broker.
+
+    Frames returned by `latest_result` are private copies, validated
+    against the slot's sequence lock after copying, so a frame the broker
+    overwrites later can never be shown torn.
+    """
+
+    def __init__(self, name, source=0, width=640, height=480, fps=30, slots=4,
+                 idle_seconds=60.0, start_timeout=20.0):
+        self.name = name
+        self.source = source
+        self.width, self.height, self.fps, self.slots = width, height, fps, slots
+        self.idle_seconds = idle_seconds
+        self.start_timeout = start_timeout
+        self._ring = None
+
+        # Inference latency as reported by the broker, each session keeps its own display stage
+        self.stats = {
+            "inference": StageStats("inference"),
+        }
+
+    def _broker_alive(self, ring):
+        """Whether the broker behind a ring is still publishing."""
+        return (ring.ints[H_STATE] != FAILED and _pid_alive(int(ring.ints[H_PID]))
+                and time.time() - ring.floats[F_BROKER_BEAT] < max(5.0, self.start_timeout))
+
+    def _spawn_broker(self):
+        """Start a broker process, it gives up quietly if another one won the race."""
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.Popen(
+            [sys.executable, "-m", "components.camera_broker", "--name", self.name,
+             "--source", str(self.source), "--width", str(self.width), "--height", str(self.height),
+             "--fps", str(self.fps), "--slots", str(self.slots), "--idle-seconds", str(self.idle_seconds)],
+            cwd=project_dir, start_new_session=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+    def start(self):
+        """Attach to the broker, starting one if needed. Returns False if the camera failed."""
+        if self._ring is not None and self._broker_alive(self._ring):
+            return True
+        self.stop()
+
+        deadline = time.monotonic() + self.start_timeout
+        spawned = False
+        while time.monotonic() < deadline:
+            try:
+                ring = FrameRing.attach(self.name)
+            except (FileNotFoundError, ValueError):
+                if not spawned:
+                    self._spawn_broker()
+                    spawned = True
+                time.sleep(0.05)
+                continue
+
+            state = ring.ints[H_STATE]
+            if state == RUNNING and self._broker_alive(ring):
+                ring.floats[F_READER_BEAT] = time.time()
+                self._ring = ring
+                return True
+            broker_pid = int(ring.ints[H_PID])
+            if state == FAILED or not _pid_alive(broker_pid):
+                ring.close()
+                if spawned:
+                    return False
+                # Left behind by a broker that died or failed, let a new broker replace it
+                unlink_ring(self.name, broker_pid)
+                continue
+            ring.close()
+            time.sleep(0.05)
+        return False
+
+    def latest_result(self, after=0, timeout=1.0):
+        """Wait for a tracked frame newer than `after`.
+
+        Returns (seq, (frame, landmarks)), or (after, None) on timeout or if
+        the broker stopped.
+        """
+        ring = self._ring
+        if ring is None:
+            return after, None
+
+        deadline = time.monotonic() + timeout
+        poll = 1.0 / (self.fps * 4)
+        while True:
+            ring.floats[F_READER_BEAT] = time.time()
+            seq = int(ring.ints[H_SEQ])
+            if seq > after:
+                result = ring.read(seq)
+                if result is not None:
+                    frame, landmarks, inference_ms = result
+                    self.stats["inference"].record(inference_ms / 1000)
+                    return seq, (frame, landmarks)
+            if time.monotonic() >= deadline or not self._broker_alive(ring):
+                return after, None
+            time.sleep(poll)
+
+    def stop(self):
+        """Detach from the broker, it keeps running for other viewers."""
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+def run_broker(name, source, width, height, fps, slots, idle_seconds):
+    """Own the camera ring: capture, track hands and publish until nobody reads."""
+    # Imported here so subscribers never load MediaPipe
+    from components.camera_service import CameraService
+    from components.hand_tracker import HandTracker
+
+    try:
+        ring = FrameRing.create(name, width, height, slots)
+    except FileExistsError:
+        return 0
+
+    service = CameraService(HandTracker, source=source, width=width, height=height, fps=fps)
+    try:
+        if not service.start():
+            ring.ints[H_STATE] = FAILED
+            time.sleep(5.0)  # Give subscribers time to see the failure
+            return 1
+        ring.ints[H_STATE] = RUNNING
+
+        seq = 0
+        inference = service.stats["inference"]
+        while time.time() - ring.floats[F_READER_BEAT] < idle_seconds:
+            ring.floats[F_BROKER_BEAT] = time.time()
+            seq, result = service.latest_result(after=seq, timeout=1.0)
+            if result is None:
+                if not service.running and not service.start():
+                    ring.ints[H_STATE] = FAILED
+                    return 1
+                continue
+            frame, landmarks = result
+            inference_ms = inference.durations[-1] * 1000 if inference.durations else 0.0
+            ring.publish(frame, landmarks, inference_ms)
+        return 0
+    finally:
+        service.stop()
+        ring.close()
+        # A subscriber may already have replaced a failed broker's ring
+        unlink_ring(name, os.getpid())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", default="pixel_play_camera", help="shared memory segment name")
+    parser.add_argument("--source", default="0", help="webcam index, video file, image directory or trace")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--idle-seconds", type=float, default=60.0)
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    sys.exit(run_broker(args.name, source, args.width, args.height, args.fps, args.slots, args.idle_seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import atexit
+import threading
+import time
+import cv2
+from components.frame_pipeline import FramePacer, LatestSlot, StageStats
+from components.frame_sources import ReplayTracker, open_frame_source
+
+class CameraService:
+    """Long-lived webcam capture and hand tracker shared across Streamlit reruns.
+
+    The capture device and the tracker are opened once per process and run as
+    a pipeline: a capture thread feeds an inference worker, which publishes
+    tracked frames for the display stage in each session. Stages are linked
+    by single-slot queues that drop stale frames, so a slow frame never delays
+    the frames after it.
+    """
+
+    def __init__(self, tracker_factory, source=0, width=640, height=480, fps=30, max_read_failures=30):
+        self.tracker_factory = tracker_factory
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.max_read_failures = max_read_failures
+
+        self._capture = None
+        self._tracker = None
+        self._threads = []
+        self._stop_event = threading.Event()
+
+        # Guards opening/closing the device and the tracker
+        self._lock = threading.Lock()
+        # MediaPipe graphs are not safe to call from several threads at once
+        self._tracker_lock = threading.Lock()
+
+        # Stage queues, each only ever holds the newest item
+        self._frames = LatestSlot()
+        self._results = LatestSlot()
+
+        # Per-stage latency, each session keeps its own display stage
+        self.stats = {
+            "capture": StageStats("capture"),
+            "inference": StageStats("inference"),
+        }
+
+        atexit.register(self.stop)
+
+    @property
+    def running(self):
+        """Whether the capture and inference threads are alive."""
+        return (not self._stop_event.is_set() and bool(self._threads)
+                and all(thread.is_alive() for thread in self._threads))
+
+    @property
+    def frame_id(self):
+        """Sequence number of the most recently grabbed frame."""
+        return self._frames.seq
+
+    def start(self):
+        """Open the camera and start the pipeline threads if not already running."""
+        with self._lock:
+            if self.running:
+                return True
+            if not self._join_threads():
+                # A capture thread from the last run is still stuck in read() and owns the device
+                return False
+
+            # Webcam index, video file, image directory or landmark trace
+            cap = open_frame_source(self.source)
+            if not cap.isOpened():
+                cap.release()
+                return False
+
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+            self._capture = cap
+
+            if hasattr(cap, "read_landmarks"):
+                # Recorded traces replay landmarks instead of running inference
+                self._close_tracker()
+                self._tracker = ReplayTracker(cap)
+            elif self._tracker is None:
+                self._tracker = self.tracker_factory()
+
+            self._frames.reopen()
+            self._results.reopen()
+            self._stop_event.clear()
+            self._threads = [
+                threading.Thread(target=self._capture_loop, args=(cap,), name="camera-capture", daemon=True),
+                threading.Thread(target=self._inference_loop, args=(self._tracker,), name="camera-inference", daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
+            return True
+
+    def _capture_loop(self, capture):
+        """Capture stage: grab frames at the target rate into the frame slot.
+
+        The capture is passed in rather than read from `self`, so a thread
+        that outlives stop() keeps releasing its own device, never the next one.
+        """
+        stats = self.stats["capture"]
+        pacer = FramePacer(self.fps)
+        failures = 0
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = capture.read()
+            if not ret:
+                failures += 1
+                if failures >= self.max_read_failures:
+                    # Device is gone, let the next start() reopen it
+                    break
+                time.sleep(0.01)
+                continue
+
+            failures = 0
+            stats.record(time.perf_counter() - start)
+            self._frames.put(frame)
+            pacer.wait()
+
+        capture.release()
+        self._stop_event.set()
+        self._frames.close()
+
+    def _inference_loop(self, tracker):
+        """Inference stage: track hands on the newest frame and publish it."""
+        stats = self.stats["inference"]
+        seq = 0
+        while not self._stop_event.is_set():
+            new_seq, frame = self._frames.get(after=seq, timeout=0.5)
+            if frame is None:
+                continue
+            if seq:
+                stats.dropped += new_seq - seq - 1
+            seq = new_seq
+
+            start = time.perf_counter()
+            with self._tracker_lock:
+                frame, landmarks = tracker.detect(frame)
+                tracker.annotate(frame, landmarks)
+            stats.record(time.perf_counter() - start)
+
+            self._results.put((frame, landmarks))
+
+        self._results.close()
+
+    def read(self, timeout=1.0):
+        """Return the most recent raw frame, waiting briefly for the first one."""
+        _, frame = self._frames.get(after=0, timeout=timeout)
+        return frame
+
+    def latest_result(self, after=0, timeout=1.0):
+        """Wait for a tracked frame newer than `after`.
+
+        Returns (seq, (frame, landmarks)), or (after, None) on timeout. The
+        frame is shared between sessions and must not be modified.
+        """
+        return self._results.get(after=after, timeout=timeout)
+
+    def process(self, frame):
+        """Run the shared hand tracker on a frame synchronously."""
+        with self._tracker_lock:
+            return self._tracker.process_frame(frame)
+
+    def _join_threads(self):
+        """Wait for the pipeline threads to exit, False if one is still running."""
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        if self._threads:
+            return False
+        # The capture thread released the device on its way out
+        self._capture = None
+        return True
+
+    def stop(self):
+        """Stop the pipeline and release the camera and the tracker."""
+        with self._lock:
+            self._stop_event.set()
+            self._frames.close()
+            self._results.close()
+            if self._join_threads():
+                # Only once the inference thread is gone, it may still be using the tracker
+                self._close_tracker()
+
+    def _close_tracker(self):
+        """Release the tracker, a new one is built on the next start()."""
+        with self._tracker_lock:
+            if self._tracker is not None:
+                self._tracker.close()
+                self._tracker = None
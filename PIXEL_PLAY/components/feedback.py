@@ -0,0 +1,65 @@
+import time
+
+class FeedbackOverlay:
+    """A pre-rendered patch shown over one board cell until it expires."""
+
+    __slots__ = ("x", "y", "patch", "correct", "expires_at")
+
+    def __init__(self, x, y, patch, correct, expires_at):
+        self.x = x
+        self.y = y
+        self.patch = patch
+        self.correct = correct
+        self.expires_at = expires_at
+
+class FeedbackQueue:
+    """Timed placement feedback, composited onto the board while rendering.
+
+    Overlays are added with an expiry time instead of blocking the script
+    thread, so camera processing keeps running while feedback is on screen.
+    """
+
+    def __init__(self):
+        self.overlays = []
+
+    def add(self, x, y, patch, correct, duration):
+        """Show `patch` with its top-left corner at (x, y) for `duration` seconds."""
+        self.overlays.append(FeedbackOverlay(x, y, patch, correct, time.monotonic() + duration))
+
+    def prune(self, now=None):
+        """Drop expired overlays. Returns True if any were removed."""
+        now = time.monotonic() if now is None else now
+        active = [overlay for overlay in self.overlays if overlay.expires_at > now]
+        removed = len(active) != len(self.overlays)
+        self.overlays = active
+        return removed
+
+    @property
+    def key(self):
+        """Identifies the visible overlays, for caching the composited board."""
+        return tuple((overlay.x, overlay.y, overlay.expires_at) for overlay in self.overlays)
+
+    def composite(self, image, scale=1.0):
+        """Return the image with active overlays, or the image itself if none.
+
+        `scale` places full resolution overlays on a smaller board level.
+        """
+        if not self.overlays:
+            return image
+
+        import cv2
+        image = image.copy()
+        for overlay in self.overlays:
+            patch, x, y = overlay.patch, overlay.x, overlay.y
+            if scale != 1.0:
+                x, y = round(x * scale), round(y * scale)
+                h, w = patch.shape[:2]
+                patch = cv2.resize(patch, (max(1, round(w * scale)), max(1, round(h * scale))),
+                                   interpolation=cv2.INTER_AREA)
+            # Clip to the image, the patch may reach past the last tile
+            h, w = image[y:y + patch.shape[0], x:x + patch.shape[1]].shape[:2]
+            image[y:y + h, x:x + w] = patch[:h, :w]
+        return image
+
+    def __len__(self):
+        return len(self.overlays)
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+
+class LatestSlot:
+    """Single-slot bounded queue that always holds the newest item.
+
+    Putting a new item overwrites the previous one, so a slow consumer skips
+    stale frames instead of queueing them. Each item gets a sequence number so
+    consumers can tell how many items they missed.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self._closed = False
+
+    @property
+    def seq(self):
+        """Sequence number of the newest item."""
+        return self._seq
+
+    def put(self, item):
+        """Replace the current item and wake up waiting consumers."""
+        with self._cond:
+            self._item = item
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, after=0, timeout=None):
+        """Wait for an item newer than `after` and return (seq, item).
+
+        Returns (after, None) if the timeout expires or the slot is closed.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after or self._closed, timeout)
+            if self._seq <= after:
+                return after, None
+            return self._seq, self._item
+
+    def close(self):
+        """Wake up all consumers so they can exit."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        """Allow waiting on the slot again after close()."""
+        with self._cond:
+            self._closed = False
+
+class StageStats:
+    """Rolling latency window for one pipeline stage."""
+
+    def __init__(self, name, window=240):
+        self.name = name
+        self.durations = deque(maxlen=window)
+        self.timestamps = deque(maxlen=window)
+        self.dropped = 0
+
+    def record(self, duration):
+        """Record how long one item spent in this stage."""
+        self.durations.append(duration)
+        self.timestamps.append(time.perf_counter())
+
+    def percentile(self, q):
+        """Latency percentile in milliseconds."""
+        if not self.durations:
+            return 0.0
+        return float(np.percentile(np.fromiter(self.durations, dtype=np.float64), q)) * 1000
+
+    @property
+    def fps(self):
+        """Items per second over the current window."""
+        if len(self.timestamps) < 2:
+            return 0.0
+        elapsed = self.timestamps[-1] - self.timestamps[0]
+        return (len(self.timestamps) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Get a dict with fps, p50/p99 latency and dropped frame count."""
+        return {
+            "stage": self.name,
+            "fps": round(self.fps, 1),
+            "p50_ms": round(self.percentile(50), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "dropped": self.dropped,
+        }
+
+class FramePacer:
+    """Sleep just enough to hold a target frame rate."""
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = time.perf_counter()
+
+    def wait(self):
+        """Block until the next frame is due."""
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        self._next += self.interval
+        if self._next > now:
+            time.sleep(self._next - now)
+        else:
+            # Running behind, do not try to catch up with a burst of frames
+            self._next = now
@@ -0,0 +1,251 @@
+import glob
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+TRACE_EXTENSIONS = ('.jsonl',)
+
+class ImageSequenceSource:
+    """Frame source that replays a list of images like cv2.VideoCapture.
+
+    Images are decoded and resized once, so replaying them measures the
+    tracker rather than JPEG decoding. Playback loops by default.
+    """
+
+    def __init__(self, paths, loop=True, fps=None):
+        self.paths = sorted(paths)
+        self.loop = loop
+        self.fps = fps
+        self.width = None
+        self.height = None
+        self._frames = None
+        self._index = 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def set(self, prop, value):
+        """Support the width, height and fps properties set on webcams."""
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = value
+        else:
+            return False
+        self._frames = None
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.paths)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps or 0
+        return 0
+
+    def _load(self):
+        """Decode every image once at the requested size."""
+        frames = []
+        for path in self.paths:
+            img = cv2.imread(path)
+            if img is None:
+                continue
+            if self.width and self.height:
+                img = cv2.resize(img, (self.width, self.height), interpolation=cv2.INTER_AREA)
+            frames.append(img)
+        self._frames = frames
+
+    def read(self):
+        if self._frames is None:
+            self._load()
+        if not self._frames or (not self.loop and self._index >= len(self._frames)):
+            return False, None
+
+        frame = self._frames[self._index % len(self._frames)]
+        self._index += 1
+        # Hand out a copy, a real capture returns a fresh buffer every time
+        return True, frame.copy()
+
+    def release(self):
+        self._frames = None
+
+class VideoFileSource:
+    """Video file source that can loop back to the start when it ends."""
+
+    def __init__(self, path, loop=True):
+        self.path = path
+        self.loop = loop
+        self._capture = cv2.VideoCapture(path)
+        self.width = None
+        self.height = None
+
+    def isOpened(self):
+        return self._capture.isOpened()
+
+    def set(self, prop, value):
+        # Video files ignore size requests, resize after decoding instead
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+            return True
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+            return True
+        return self._capture.set(prop, value)
+
+    def get(self, prop):
+        return self._capture.get(prop)
+
+    def read(self):
+        ret, frame = self._capture.read()
+        if not ret and self.loop:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._capture.read()
+        if ret and self.width and self.height and frame.shape[:2] != (self.height, self.width):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        return ret, frame
+
+    def release(self):
+        self._capture.release()
+
+class LandmarkTraceSource:
+    """Replays recorded landmarks without a camera or a MediaPipe graph.
+
+    A trace is a JSON lines file with one record per frame:
+    {"t": seconds, "landmarks": [[x, y, z], ...] or null}. read() advances
+    to the next record and returns a blank frame of the requested size, and
+    read_landmarks() the (21, 3) array recorded for that frame, so the trace
+    can drive ReplayTracker and the gesture logic. The capture and inference
+    threads of the camera service may call them concurrently.
+    """
+
+    def __init__(self, path, loop=True):
+        self.path = path
+        self.loop = loop
+        self.width = 640
+        self.height = 480
+        self.fps = None
+        self.records = load_landmark_trace(path)
+        self._index = 0
+        self._current = None  # (ret, landmarks) of the last frame read
+        self._blank = None
+        self._lock = threading.Lock()
+
+    def isOpened(self):
+        return bool(self.records)
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = value
+        else:
+            return False
+        self._blank = None
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.records)
+        return 0
+
+    def read_landmarks(self):
+        """Return (ret, landmarks) recorded for the frame last returned by read()."""
+        with self._lock:
+            if self._current is None:
+                return False, None
+            return self._current
+
+    def read(self):
+        with self._lock:
+            if not self.records or (not self.loop and self._index >= len(self.records)):
+                self._current = None
+                return False, None
+            self._current = (True, self.records[self._index % len(self.records)])
+            self._index += 1
+            if self._blank is None:
+                self._blank = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            return True, self._blank.copy()
+
+    def release(self):
+        with self._lock:
+            self._blank = None
+            self._current = None
+
+class ReplayTracker:
+    """Drop-in for HandTracker.detect that returns landmarks from a trace."""
+
+    def __init__(self, source):
+        self.source = source
+
+    def detect(self, frame):
+        """Flip the frame like HandTracker and return the landmarks recorded for it."""
+        frame = cv2.flip(frame, 1)
+        _, landmarks = self.source.read_landmarks()
+        return frame, landmarks
+
+    def annotate(self, frame, landmarks):
+        return frame
+
+    def close(self):
+        pass
+
+def load_landmark_trace(path):
+    """Load a landmark trace into a list of (21, 3) arrays or None."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            landmarks = json.loads(line).get("landmarks")
+            records.append(None if landmarks is None else np.asarray(landmarks, dtype=np.float32))
+    return records
+
+class LandmarkTraceWriter:
+    """Record landmarks frame by frame into a trace file."""
+
+    def __init__(self, path):
+        self._file = open(path, 'w')
+        self._start = time.perf_counter()
+
+    def write(self, landmarks):
+        record = {
+            "t": round(time.perf_counter() - self._start, 4),
+            "landmarks": None if landmarks is None else np.round(landmarks, 5).tolist(),
+        }
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self._file.close()
+
+def open_frame_source(source, loop=True):
+    """Open a frame source with the cv2.VideoCapture interface.
+
+    `source` can be a webcam index, a video file, a directory or glob of
+    images (e.g. "frames/frame_*.jpg") or a .jsonl landmark trace.
+    """
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return cv2.VideoCapture(int(source))
+
+    if os.path.isdir(source):
+        paths = [os.path.join(source, f) for f in os.listdir(source)
+                 if f.lower().endswith(IMAGE_EXTENSIONS)]
+        return ImageSequenceSource(paths, loop=loop)
+
+    if any(ch in source for ch in '*?['):
+        return ImageSequenceSource(glob.glob(source), loop=loop)
+
+    if source.lower().endswith(TRACE_EXTENSIONS):
+        return LandmarkTraceSource(source, loop=loop)
+
+    if source.lower().endswith(IMAGE_EXTENSIONS):
+        return ImageSequenceSource([source], loop=loop)
+
+    return VideoFileSource(source, loop=loop)
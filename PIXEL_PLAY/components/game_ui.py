@@ -1,9 +1,17 @@
 import streamlit as st
-import cv2
+import base64
 import numpy as np
-from PIL import Image
-import time
+from components.board_renderer import BoardPyramid, BoardStore
+from components.feedback import FeedbackQueue
+from components.layout_index import tray_geometry
+from components.render_cache import RenderCache
+from components.tile_tray import build_tile_atlas
 from game.game_logic import update_game_state, check_tile_placement
+from game.hints import describe_transform, hint
+from game.puzzle_generator import load_puzzle_image, render_tile, render_tiles
+from game.score_manager import ScoreManager
+from utils.config import RENDER_CONFIG, TRAY_CONFIG
+from utils.metrics import get_metrics
 
 def create_sidebar():
     """Create the sidebar with game information and settings."""
@@ -39,13 +47,23 @@ def render_game_over():
         st.title("🎉 Congratulations! You solved the puzzle!")
         st.balloons()
         # Display completed image
-        st.image(st.session_state.puzzle_image, caption="Completed Puzzle")
+        st.image(load_puzzle_image(st.session_state.puzzle), caption="Completed Puzzle")
+        
+        # Record the result once per game, and rank it against every game of this mode
+        scores = ScoreManager()
+        if st.session_state.get("saved_game_id") != st.session_state.game_id:
+            scores.save_score("Player", st.session_state.score, st.session_state.attempts, 0,
+                              st.session_state.game_mode)
+            st.session_state.saved_game_id = st.session_state.game_id
+        rank, percentile, total = scores.get_rank(st.session_state.game_mode, st.session_state.score)
         
         # Display game stats
         st.subheader("Game Statistics")
         st.metric("Final Score", st.session_state.score)
         st.metric("Attempts", st.session_state.attempts)
         st.metric("Game Mode", st.session_state.game_mode)
+        st.metric("Global Rank", f"#{rank} of {total}", f"Better than {percentile:.0f}% of games",
+                  delta_color="off")
     else:
         st.title("Game Over")
         st.write("Better luck next time!")
@@ -60,79 +78,153 @@ def render_game_ui():
     with puzzle_col:
         st.subheader("Puzzle Board")
         # Display current puzzle state
-        if st.session_state.puzzle_image is not None:
+        if st.session_state.puzzle is not None:
             # Create a placeholder for the puzzle
             puzzle_placeholder = st.empty()
             
-            # Display the puzzle with missing tiles
-            puzzle_board = create_puzzle_board()
-            puzzle_placeholder.image(puzzle_board, use_column_width=True)
+            # Display the puzzle with missing tiles and any active placement
+            # feedback, encoded once per board version, size and overlay set
+            create_puzzle_board()
+            board = get_board_buffer()
+            level = board.level_for(get_display_width())
+            feedback = get_feedback_queue()
+            feedback.prune()
+            encoded = get_render_cache().get_or_encode(
+                (st.session_state.game_id, "board", level.image.shape[1], board.version, feedback.key),
+                lambda: feedback.composite(level.image, board.scale(level))
+            )
+            show_encoded(puzzle_placeholder, encoded)
     
     with tiles_col:
         st.subheader("Available Tiles")
-        # Display shuffled tiles
-        if st.session_state.shuffled_tiles is not None:
-            tiles_container = st.container()
-            with tiles_container:
-                # Display each shuffled tile
-                for i, tile in enumerate(st.session_state.shuffled_tiles):
-                    if tile['visible']:  # Only show tiles that haven't been placed yet
-                        tile_img = Image.fromarray(tile['image'])
-                        st.image(tile_img, caption=f"Tile {i+1}", use_column_width=True)
+        # Display all shuffled tiles as one atlas image, rebuilt only after a placement
+        puzzle = st.session_state.puzzle
+        if puzzle is not None:
+            geometry = tray_geometry(len(puzzle), st.session_state.correct_placements)
+            if len(geometry):
+                # Scale the tray with the board level picked for this display
+                board = get_board_buffer()
+                scale = board.scale(board.level_for(get_display_width()))
+                slot_size = max(RENDER_CONFIG["min_slot_size"], round(TRAY_CONFIG["slot_size"] * scale))
+                encoded = get_render_cache().get_or_encode(
+                    (st.session_state.game_id, "tray", slot_size, geometry.visible_tiles),
+                    lambda: build_tray_atlas(puzzle, geometry, slot_size)
+                )
+                show_encoded(st, encoded)
+                
+                # Point out where the first tile in the tray goes
+                if st.button("Hint"):
+                    show_hint(puzzle, geometry.visible_tiles[0])
+
+@st.cache_resource
+def get_render_cache():
+    """Get the process-wide cache of encoded board and tile images."""
+    return RenderCache(
+        max_bytes=RENDER_CONFIG["cache_mb"] * 1024 * 1024,
+        image_format=RENDER_CONFIG["format"],
+        quality=RENDER_CONFIG["quality"]
+    )
+
+def show_encoded(container, encoded, caption=None):
+    """Display pre-encoded image bytes without Streamlit encoding them again."""
+    if encoded.format == "webp":
+        # st.image only passes JPEG and PNG through, embed WebP directly
+        data = base64.b64encode(encoded.data).decode("ascii")
+        container.markdown(
+            f'<img src="data:{encoded.mimetype};base64,{data}" style="width:100%">',
+            unsafe_allow_html=True
+        )
+        if caption:
+            container.caption(caption)
+    else:
+        container.image(encoded.data, caption=caption, output_format=encoded.format.upper(),
+                        use_column_width=True)
+
+@st.cache_resource
+def get_board_store():
+    """Get the process-wide store of board buffers."""
+    return BoardStore(max_entries=RENDER_CONFIG["board_buffers"])
+
+def get_board_buffer():
+    """Get the persistent board pyramid for the current game, creating it once."""
+    puzzle = st.session_state.puzzle
+    return get_board_store().get(
+        st.session_state.game_id,
+        lambda: BoardPyramid(
+            load_puzzle_image(puzzle),
+            puzzle.grid_size,
+            puzzle.missing_positions,
+            game_id=st.session_state.game_id,
+            widths=RENDER_CONFIG["board_levels"]
+        )
+    )
+
+def get_display_width():
+    """Width the board is displayed at, from the ?width= query parameter or the config."""
+    width = st.query_params.get("width")
+    if width is not None and width.isdigit():
+        return int(width)
+    return RENDER_CONFIG["display_width"]
+
+def build_tray_atlas(puzzle, geometry, slot_size):
+    """Render the tray atlas image for the visible tiles."""
+    with get_metrics().span("tray_atlas"):
+        return build_tile_atlas(get_tray_tiles(puzzle, geometry.visible_tiles), geometry, slot_size).image
+
+def show_hint(puzzle, tile_index):
+    """Tell the player where a tray tile goes and how it is turned."""
+    metrics = get_metrics()
+    metrics.increment("hints")
+    with metrics.span("hint"):
+        best = hint(puzzle, tile_index, st.session_state.correct_placements, load_puzzle_image(puzzle))
+    if best is None:
+        return
+    position, code, _ = best
+    row, col = divmod(position, puzzle.grid_size)
+    st.info(f"The first tile in the tray goes in row {row + 1}, column {col + 1} ({describe_transform(code)}).")
+
+def get_tray_tiles(puzzle, tile_indices):
+    """Pixels of the given tray tiles, derived from the puzzle descriptor."""
+    stack = render_tiles(puzzle, tile_indices)
+    return dict(zip(tile_indices, stack))
 
 def create_puzzle_board():
-    """Create the current puzzle board image with missing tiles."""
-    # Get puzzle dimensions
-    grid_size = int(st.session_state.game_mode.split('x')[0])
-    puzzle_img = st.session_state.puzzle_image.copy()
-    
-    # Create a mask for missing tiles
-    for pos in st.session_state.missing_positions:
-        if pos not in st.session_state.correct_placements:
-            # Calculate tile position
-            tile_height = puzzle_img.shape[0] // grid_size
-            tile_width = puzzle_img.shape[1] // grid_size
-            
-            row, col = pos // grid_size, pos % grid_size
-            y1, y2 = row * tile_height, (row + 1) * tile_height
-            x1, x2 = col * tile_width, (col + 1) * tile_width
-            
-            # Draw a gray rectangle to represent missing tile
-            cv2.rectangle(puzzle_img, (x1, y1), (x2, y2), (200, 200, 200), -1)
-            cv2.rectangle(puzzle_img, (x1, y1), (x2, y2), (0, 0, 0), 2)
-    
-    return puzzle_img
+    """Get the current puzzle board image with missing tiles."""
+    # Only placements made since the last rerun touch any pixels
+    with get_metrics().span("board_compose"):
+        board = get_board_buffer()
+        return board.sync(st.session_state.correct_placements)
+
+def get_feedback_queue():
+    """Get the placement feedback overlays for the current session."""
+    if st.session_state.get("feedback") is None:
+        st.session_state.feedback = FeedbackQueue()
+    return st.session_state.feedback
 
 def display_feedback(correct, tile_index, position):
-    """Display feedback when a tile is placed."""
-    grid_size = int(st.session_state.game_mode.split('x')[0])
-    puzzle_img = st.session_state.puzzle_image.copy()
+    """Queue feedback for a placed tile, shown on the board until it expires."""
+    import cv2
+    board = get_board_buffer()
     
-    # Calculate tile position
-    tile_height = puzzle_img.shape[0] // grid_size
-    tile_width = puzzle_img.shape[1] // grid_size
+    # Calculate tile position on the full board, cv2.rectangle fills the end point as well
+    x1, y1, x2, y2 = board.full.cell_rect(position)
+    h, w = board.full.image.shape[:2]
+    x2_fill, y2_fill = min(w, x2 + 1), min(h, y2 + 1)
     
-    row, col = position // grid_size, position % grid_size
-    y1, y2 = row * tile_height, (row + 1) * tile_height
-    x1, x2 = col * tile_width, (col + 1) * tile_width
-    
-    # Draw colored rectangle based on correctness
+    # Colored patch based on correctness
     color = (0, 255, 0) if correct else (0, 0, 255)  # Green for correct, Red for incorrect
-    
-    # Create a copy of the image with the feedback
-    feedback_img = puzzle_img.copy()
-    cv2.rectangle(feedback_img, (x1, y1), (x2, y2), color, -1)
+    patch = np.empty((y2_fill - y1, x2_fill - x1, 3), dtype=np.uint8)
+    patch[:] = color
     
     # Blend original tile with the color for a semi-transparent effect
-    tile_img = st.session_state.shuffled_tiles[tile_index]['image']
+    tile_img = render_tile(st.session_state.puzzle, tile_index)
     resized_tile = cv2.resize(tile_img, (x2-x1, y2-y1))
     
     alpha = 0.7
-    feedback_img[y1:y2, x1:x2] = cv2.addWeighted(
+    patch[:y2-y1, :x2-x1] = cv2.addWeighted(
         resized_tile, alpha,
-        feedback_img[y1:y2, x1:x2], 1-alpha, 0
+        patch[:y2-y1, :x2-x1], 1-alpha, 0
     )
     
-    # Display feedback
-    st.image(feedback_img, use_column_width=True)
-    time.sleep(1)  # Show for 1 second
\ No newline at end of file
+    # Composited during normal rendering instead of sleeping on the script thread
+    get_feedback_queue().add(x1, y1, patch, correct, RENDER_CONFIG["feedback_seconds"])
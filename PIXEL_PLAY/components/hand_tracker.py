@@ -1,201 +1,349 @@
+import time
 import streamlit as st
 import cv2
-import mediapipe as mp
 import numpy as np
+from components.camera_broker import CameraSubscriber
+from components.camera_service import CameraService
+from components.frame_pipeline import FramePacer, StageStats
+from components.game_ui import display_feedback, get_feedback_queue
+from components.layout_index import LayoutIndex
+from components.tracker_warmup import create_tracker
 from game.game_logic import check_tile_placement, update_game_state
+from utils.config import CAMERA_CONFIG, HAND_TRACKING
+from utils.metrics import get_metrics
+
+# Landmark indices used for gestures
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
 
 class HandTracker:
     def __init__(self):
+        # Imported on first use, MediaPipe is most of the app's import time
+        import mediapipe as mp
+
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+            max_num_hands=HAND_TRACKING["max_num_hands"],
+            min_detection_confidence=HAND_TRACKING["min_detection_confidence"],
+            min_tracking_confidence=HAND_TRACKING["min_tracking_confidence"]
         )
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
-        
+        self.connections = list(self.mp_hands.HAND_CONNECTIONS)
+        self.metrics = get_metrics()
+        self.pinch_threshold = HAND_TRACKING["pinch_threshold"]
+
+        # Adaptive inference: reuse landmarks of a still hand instead of tracking it again
+        self.adaptive = HAND_TRACKING["adaptive"]
+        self.stable_threshold = HAND_TRACKING["stable_threshold"]
+        self.max_skipped_frames = HAND_TRACKING["max_skipped_frames"]
+        self.last_landmarks = None
+        self.stable = False
+        self.skipped_frames = 0
+        self.mode_counts = {"inference": 0, "skipped": 0}
+
         # States for dragging
-        self.dragging = False
-        self.selected_tile_index = None
-        self.pinch_threshold = 0.05  # Distance threshold for pinch detection
+        self.gestures = GestureController(self.pinch_threshold)
 
     def process_frame(self, frame):
         """Process a camera frame and detect hand gestures."""
         if frame is None:
             return frame
-            
+
+        frame, landmarks = self.detect(frame)
+        self.annotate(frame, landmarks)
+
+        if landmarks is not None:
+            self.gestures.update(landmarks, frame.shape)
+
+        return frame
+
+    def detect(self, frame):
+        """Flip the frame and run MediaPipe Hands on it.
+
+        Returns the flipped BGR frame and a (21, 3) array of normalized
+        landmarks, or None when no hand is visible. In adaptive mode a still
+        hand reuses its last landmarks. Every other frame goes through the
+        video graph whole, which already tracks the hand between frames and
+        only runs palm detection once it loses it.
+        """
         # Flip the frame horizontally for a later selfie-view display
         frame = cv2.flip(frame, 1)
-        
+
+        if not self.adaptive:
+            self.mode_counts["inference"] += 1
+            return frame, self._run_hands(frame)
+
+        # Hand has not moved and pinch state is unchanged, skip this inference
+        if self.stable and self.skipped_frames < self.max_skipped_frames:
+            self.skipped_frames += 1
+            self.mode_counts["skipped"] += 1
+            return frame, self.last_landmarks
+        self.skipped_frames = 0
+
+        self.mode_counts["inference"] += 1
+        landmarks = self._run_hands(frame)
+        self._update_track(landmarks)
+        return frame, landmarks
+
+    def _run_hands(self, frame):
+        """Run MediaPipe on the whole frame, returning normalized landmarks or None."""
         # Convert the BGR image to RGB
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
+
         # Process the frame with MediaPipe Hands
-        results = self.hands.process(rgb_frame)
-        
-        # Draw hand landmarks on the frame
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style()
-                )
-                
-                # Get index finger and thumb coordinates
-                index_finger_tip = hand_landmarks.landmark[8]
-                thumb_tip = hand_landmarks.landmark[4]
-                
-                # Calculate distance between index finger and thumb
-                distance = self.calculate_distance(index_finger_tip, thumb_tip)
-                
-                # Draw circle at index finger tip
-                h, w, c = frame.shape
-                index_x, index_y = int(index_finger_tip.x * w), int(index_finger_tip.y * h)
-                cv2.circle(frame, (index_x, index_y), 10, (0, 255, 0), -1)
-                
-                # Check if fingers are pinched (close together)
-                if distance < self.pinch_threshold:
-                    # Pinch detected
-                    cv2.putText(frame, "Pinch Detected", (50, 50), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                    
-                    # Handle selection and dragging
-                    self.handle_pinch_gesture(index_x, index_y)
-                else:
-                    # Release detected
-                    if self.dragging:
-                        # Handle tile placement
-                        self.handle_tile_placement(index_x, index_y)
-                        self.dragging = False
-                        self.selected_tile_index = None
-        
+        with self.metrics.span("mediapipe"):
+            results = self.hands.process(rgb_frame)
+
+        if not results.multi_hand_landmarks:
+            return None
+
+        hand_landmarks = results.multi_hand_landmarks[0]
+        return np.array(
+            [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32
+        )
+
+    def _update_track(self, landmarks):
+        """Update whether the hand is still from the latest landmarks."""
+        previous = self.last_landmarks
+        self.last_landmarks = landmarks
+
+        if landmarks is None:
+            self.stable = False
+            return
+
+        # Still hand: small motion and the same pinch state as last frame
+        self.stable = (
+            previous is not None
+            and float(np.abs(landmarks[:, :2] - previous[:, :2]).max()) < self.stable_threshold
+            and is_pinched(landmarks, self.pinch_threshold) == is_pinched(previous, self.pinch_threshold)
+        )
+
+    def annotate(self, frame, landmarks):
+        """Draw hand landmarks and the pinch state on the frame in place."""
+        if landmarks is None:
+            return frame
+
+        h, w = frame.shape[:2]
+        points = (landmarks[:, :2] * (w, h)).astype(np.int32)
+
+        # Draw hand skeleton
+        for start, end in self.connections:
+            cv2.line(frame, tuple(points[start]), tuple(points[end]), (255, 255, 255), 2)
+        for point in points:
+            cv2.circle(frame, tuple(point), 4, (0, 0, 255), -1)
+
+        # Draw circle at index finger tip
+        cv2.circle(frame, tuple(points[INDEX_FINGER_TIP]), 10, (0, 255, 0), -1)
+
+        if is_pinched(landmarks, self.pinch_threshold):
+            cv2.putText(frame, "Pinch Detected", (50, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
         return frame
-    
-    def calculate_distance(self, point1, point2):
-        """Calculate normalized distance between two points."""
-        return np.sqrt((point1.x - point2.x)**2 + (point1.y - point2.y)**2)
-    
-    def handle_pinch_gesture(self, x, y):
+
+    def close(self):
+        """Release the MediaPipe graph."""
+        self.hands.close()
+
+def calculate_distance(point1, point2):
+    """Calculate normalized distance between two landmarks."""
+    return float(np.hypot(point1[0] - point2[0], point1[1] - point2[1]))
+
+def is_pinched(landmarks, threshold):
+    """Check if index finger and thumb tips are close together."""
+    return calculate_distance(landmarks[INDEX_FINGER_TIP], landmarks[THUMB_TIP]) < threshold
+
+class GestureController:
+    """Pinch/drag state machine that turns landmarks into game actions."""
+
+    def __init__(self, pinch_threshold=0.05, state=None):
+        self.dragging = False
+        self.selected_tile_index = None
+        self.pinch_threshold = pinch_threshold  # Distance threshold for pinch detection
+        self._state = state
+
+        # Hit-test index, rebuilt only when the game, its tiles or the frame size change
+        self.layout = None
+        self._layout_key = None
+
+    @property
+    def state(self):
+        """Game state to act on, the Streamlit session unless one was given."""
+        return st.session_state if self._state is None else self._state
+
+    def get_layout(self, frame_shape):
+        """Get the layout index for the current game state and frame size."""
+        state = self.state
+        key = (state.game_id, state.state_version, frame_shape[:2])
+        if key != self._layout_key:
+            self.layout = LayoutIndex.from_state(state, frame_shape[:2])
+            self._layout_key = key
+        return self.layout
+
+    def update(self, landmarks, frame_shape):
+        """Apply one frame of landmarks.
+
+        Returns (tile_index, position, correct) when a tile was placed, else None.
+        """
+        layout = self.get_layout(frame_shape)
+        h, w = frame_shape[:2]
+        index_finger_tip = landmarks[INDEX_FINGER_TIP]
+        index_x, index_y = int(index_finger_tip[0] * w), int(index_finger_tip[1] * h)
+
+        # Check if fingers are pinched (close together)
+        if is_pinched(landmarks, self.pinch_threshold):
+            # Handle selection and dragging
+            self.handle_pinch_gesture(layout, index_x, index_y)
+            return None
+
+        # Release detected
+        placed = None
+        if self.dragging:
+            # Handle tile placement
+            placed = self.handle_tile_placement(layout, index_x, index_y)
+            self.dragging = False
+            self.selected_tile_index = None
+        return placed
+
+    def handle_pinch_gesture(self, layout, x, y):
         """Handle pinch gesture to select and drag tiles."""
-        # If not already dragging, check if a tile is selected
+        # If not already dragging, check if the pinch is on a tile
         if not self.dragging:
-            # Convert screen coordinates to normalized coordinates (0-1)
-            norm_x = x / 640  # Assuming camera width is 640
-            norm_y = y / 480  # Assuming camera height is 480
-            
-            # Check if the pinch is on a tile
-            self.selected_tile_index = self.check_tile_selection(norm_x, norm_y)
-            
+            self.selected_tile_index = layout.tile_at(x, y)
+
             if self.selected_tile_index is not None:
                 self.dragging = True
-                st.session_state.selected_tile = self.selected_tile_index
-    
-    def check_tile_selection(self, norm_x, norm_y):
-        """Check if a tile is selected based on normalized coordinates."""
-        # This is a simplified version - in a real app, you'd map the
-        # coordinates to the specific UI elements in Streamlit
-        
-        # For demonstration, let's assume tiles are in the right 30% of the screen
-        # and evenly distributed vertically
-        if norm_x > 0.7:
-            if st.session_state.shuffled_tiles:
-                visible_tiles = [i for i, tile in enumerate(st.session_state.shuffled_tiles) 
-                               if tile['visible']]
-                
-                if visible_tiles:
-                    # Divide the right area into sections based on number of visible tiles
-                    section_height = 1.0 / len(visible_tiles)
-                    
-                    for i, tile_idx in enumerate(visible_tiles):
-                        section_start = i * section_height
-                        section_end = (i + 1) * section_height
-                        
-                        if section_start <= norm_y < section_end:
-                            return tile_idx
-        
-        return None
-    
-    def handle_tile_placement(self, x, y):
+                self.state.selected_tile = self.selected_tile_index
+
+    def handle_tile_placement(self, layout, x, y):
         """Handle tile placement when pinch is released."""
         if self.selected_tile_index is not None:
-            # Convert screen coordinates to normalized coordinates
-            norm_x = x / 640
-            norm_y = y / 480
-            
             # Check which puzzle position this corresponds to
-            position = self.check_puzzle_position(norm_x, norm_y)
-            
-            if position is not None and position in st.session_state.missing_positions:
+            position = layout.cell_at(x, y)
+
+            if position is not None and layout.is_open(position):
                 # Check if tile placement is correct
-                correct = check_tile_placement(self.selected_tile_index, position)
-                
+                correct = check_tile_placement(self.selected_tile_index, position, self._state)
+
                 # Update game state
-                update_game_state(self.selected_tile_index, position, correct)
-    
-    def check_puzzle_position(self, norm_x, norm_y):
-        """Check which puzzle position corresponds to the given coordinates."""
-        # Assuming puzzle is in the left 70% of the screen
-        if norm_x < 0.7:
-            grid_size = int(st.session_state.game_mode.split('x')[0])
-            
-            # Calculate grid cell
-            grid_width = 0.7 / grid_size  # Width of each grid cell
-            grid_height = 1.0 / grid_size  # Height of each grid cell
-            
-            # Calculate grid position
-            grid_x = int(norm_x / grid_width)
-            grid_y = int(norm_y / grid_height)
-            
-            # Convert to linear position
-            position = grid_y * grid_size + grid_x
-            
-            # Make sure it's a valid position
-            if 0 <= position < grid_size * grid_size:
-                return position
-        
+                update_game_state(self.selected_tile_index, position, correct, self._state)
+                return self.selected_tile_index, position, correct
+
         return None
 
+@st.cache_resource
+def get_camera_service():
+    """Get the process-wide camera service, created on first use."""
+    if CAMERA_CONFIG["broker"]:
+        # Every server process reads the same frames from the camera broker
+        return CameraSubscriber(
+            CAMERA_CONFIG["broker_name"],
+            source=CAMERA_CONFIG["source"],
+            width=CAMERA_CONFIG["width"],
+            height=CAMERA_CONFIG["height"],
+            fps=CAMERA_CONFIG["fps"],
+            slots=CAMERA_CONFIG["broker_slots"],
+            idle_seconds=CAMERA_CONFIG["broker_idle_seconds"]
+        )
+    return CameraService(
+        tracker_factory=create_tracker,
+        source=CAMERA_CONFIG["source"],
+        width=CAMERA_CONFIG["width"],
+        height=CAMERA_CONFIG["height"],
+        fps=CAMERA_CONFIG["fps"]
+    )
+
+def get_gesture_controller():
+    """Get the pinch/drag state for the current session."""
+    if "gestures" not in st.session_state:
+        st.session_state.gestures = GestureController(HAND_TRACKING["pinch_threshold"])
+    return st.session_state.gestures
+
+def get_display_stats():
+    """Get the display stage stats for the current session."""
+    if "display_stats" not in st.session_state:
+        st.session_state.display_stats = StageStats("display")
+    return st.session_state.display_stats
+
 def start_camera():
-    """Initialize and start the camera for hand tracking."""
-    # Create a placeholder for the camera feed
+    """Run the display stage: show tracked frames and apply gestures."""
+    # Create placeholders for the camera feed and the pipeline stats
     camera_placeholder = st.empty()
-    
-    # Initialize hand tracker
-    tracker = HandTracker()
-    
-    # Start webcam
-    cap = cv2.VideoCapture(0)
-    
+    stats_placeholder = st.empty()
+
+    # Reuse the long-lived capture and inference pipeline instead of opening it per rerun
+    service = get_camera_service()
+
     # Make sure the camera is opened correctly
-    if not cap.isOpened():
+    metrics = get_metrics()
+    with metrics.span("camera_open"):
+        started = service.start()
+    if not started:
         st.error("Error: Could not open webcam.")
         return
-    
-    # Set camera properties
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    
-    # If game is still active, process frames
-    if not st.session_state.game_over:
+
+    gestures = get_gesture_controller()
+    feedback = get_feedback_queue()
+    display_stats = get_display_stats()
+    pacer = FramePacer(CAMERA_CONFIG["fps"])
+    seq = 0
+    shown = 0
+
+    # Keep showing frames while the game is active
+    while not st.session_state.game_over:
         try:
-            # Read a frame to ensure camera is working
-            ret, frame = cap.read()
-            if not ret:
+            # Take the newest tracked frame, skipping any we were too slow for
+            new_seq, result = service.latest_result(after=seq, timeout=1.0)
+            if result is None:
                 st.error("Error: Could not read from webcam.")
-                cap.release()
                 return
-                
-            # Process the frame with hand tracker
-            processed_frame = tracker.process_frame(frame)
-            
+            if seq:
+                display_stats.dropped += new_seq - seq - 1
+                metrics.increment("frames_dropped", new_seq - seq - 1)
+            seq = new_seq
+
+            start = time.perf_counter()
+            frame, landmarks = result
+
+            # Apply gestures from the latest landmarks only
+            placed = None
+            if landmarks is not None:
+                placed = gestures.update(landmarks, frame.shape)
+
             # Display the frame
-            camera_placeholder.image(processed_frame, channels="BGR", use_column_width=True)
-            
+            camera_placeholder.image(frame, channels="BGR", use_column_width=True)
+            display_stats.record(time.perf_counter() - start)
+            metrics.observe("display", time.perf_counter() - start)
+            metrics.increment("frames_shown")
+
+            shown += 1
+            if shown % CAMERA_CONFIG["fps"] == 0:
+                stats_placeholder.caption(format_pipeline_stats({**service.stats, "display": display_stats}))
+                metrics.maybe_dump()
+
         except Exception as e:
             st.error(f"Error processing webcam feed: {e}")
-            cap.release()
\ No newline at end of file
+            return
+
+        # Redraw the board after a placement, or once its feedback has expired
+        if placed is not None:
+            metrics.increment("placements")
+            metrics.increment("placements_correct" if placed[2] else "placements_incorrect")
+            display_feedback(*placed)
+            st.rerun()
+        if feedback.prune():
+            st.rerun()
+
+        pacer.wait()
+
+def format_pipeline_stats(stats):
+    """Format per-stage fps and latency as a single line."""
+    parts = []
+    for stage in stats.values():
+        summary = stage.summary()
+        parts.append(
+            f"{summary['stage']}: {summary['fps']} fps, "
+            f"p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms, "
+            f"dropped {summary['dropped']}"
+        )
+    return " | ".join(parts)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from components.image_processor import load_and_resize_image
+from utils.config import IMAGE_CACHE
+
+class PreprocessedImageCache:
+    """Puzzle images decoded and letterboxed once, then reused.
+
+    Each (path, mtime, size, target size) is stored as an .npy file and
+    memory-mapped on later loads, so starting a game never decodes the
+    original JPEG again. A bounded in-memory LRU sits in front of the disk
+    store. Returned arrays are read-only and shared, copy before drawing.
+    """
+
+    def __init__(self, cache_dir, max_entries=16):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, image_path, target_size):
+        """Cache key, changes whenever the source file is modified."""
+        stat = os.stat(image_path)
+        raw = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{target_size[0]}x{target_size[1]}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, image_path, target_size=(800, 800)):
+        """Get the letterboxed image, from memory, disk or by decoding it."""
+        key = self.key(image_path, target_size)
+
+        with self._lock:
+            img = self._entries.get(key)
+            if img is not None:
+                self._entries.move_to_end(key)
+                return img
+
+        cache_file = os.path.join(self.cache_dir, f"{key}.npy")
+        if os.path.exists(cache_file):
+            img = np.load(cache_file, mmap_mode='r')
+        else:
+            img = load_and_resize_image(image_path, target_size)
+            self._write(cache_file, img)
+            img.flags.writeable = False
+
+        with self._lock:
+            self._entries[key] = img
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return img
+
+    def warm(self, image_paths, target_sizes):
+        """Preprocess every image at every target size ahead of time."""
+        for image_path in image_paths:
+            for target_size in target_sizes:
+                self.get(image_path, target_size)
+
+    def _write(self, cache_file, img):
+        """Write atomically so a concurrent reader never sees a partial file."""
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            np.save(f, img)
+        os.replace(tmp_file, cache_file)
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
+def get_image_cache():
+    """Get the process-wide preprocessed image cache."""
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            _image_cache = PreprocessedImageCache(
+                IMAGE_CACHE["dir"], max_entries=IMAGE_CACHE["memory_entries"]
+            )
+        return _image_cache
@@ -1,10 +1,13 @@
-import cv2
 import numpy as np
 import random
 from PIL import Image
+from components.tile_transforms import TRANSFORM_CODES, apply_transform
 
 def load_and_resize_image(image_path, target_size=(800, 800)):
     """Load an image and resize it to the target size."""
+    # OpenCV takes a few hundred milliseconds to import, so the first page
+    # is drawn without it and it is loaded with the first image
+    import cv2
     img = cv2.imread(image_path)
     if img is None:
         raise FileNotFoundError(f"Could not load image from {image_path}")
@@ -32,65 +35,133 @@ def load_and_resize_image(image_path, target_size=(800, 800)):
     
     return canvas
 
+class TileGrid:
+    """Grid of tiles backed by a single strided view of the source image.
+
+    Indexing by linear position returns a read-only view of that tile in
+    O(1) without copying any pixels. Only tiles that are actually used need
+    to be materialized with `materialize` or `take`.
+    """
+
+    def __init__(self, img, grid_size):
+        h, w = img.shape[:2]
+        self.grid_size = grid_size
+        self.tile_height, self.tile_width = h // grid_size, w // grid_size
+        self.image = img
+
+        # (row, col, y, x, channel) view over the part of the image the grid covers
+        covered = img[:self.tile_height * grid_size, :self.tile_width * grid_size]
+        row_stride, col_stride = covered.strides[:2]
+        self.view = np.lib.stride_tricks.as_strided(
+            covered,
+            shape=(grid_size, grid_size, self.tile_height, self.tile_width) + covered.shape[2:],
+            strides=(self.tile_height * row_stride, self.tile_width * col_stride) + covered.strides,
+            writeable=False
+        )
+
+    def __len__(self):
+        return self.grid_size * self.grid_size
+
+    def __getitem__(self, pos):
+        if not 0 <= pos < len(self):
+            raise IndexError(f"Tile position {pos} out of range")
+        row, col = divmod(pos, self.grid_size)
+        return self.view[row, col]
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield self[pos]
+
+    def materialize(self, pos):
+        """Get an owned, writable copy of one tile."""
+        return self[pos].copy()
+
+    def take(self, positions):
+        """Copy the given tiles into one contiguous (N, h, w, 3) array."""
+        rows, cols = np.divmod(np.asarray(positions, dtype=np.intp), self.grid_size)
+        return self.view[rows, cols]
+
 def split_image_into_tiles(img, grid_size):
-    """Split an image into a grid of tiles."""
-    h, w = img.shape[:2]
-    tile_h, tile_w = h // grid_size, w // grid_size
-    
-    tiles = []
-    positions = []
-    
-    for i in range(grid_size):
-        for j in range(grid_size):
-            y1, y2 = i * tile_h, (i + 1) * tile_h
-            x1, x2 = j * tile_w, (j + 1) * tile_w
-            
-            tile = img[y1:y2, x1:x2].copy()
-            tiles.append(tile)
-            positions.append(i * grid_size + j)
-    
+    """Split an image into a grid of tiles without copying any pixels."""
+    tiles = TileGrid(img, grid_size)
+    positions = range(grid_size * grid_size)
     return tiles, positions
 
-def select_missing_tiles(positions, num_missing, grid_size):
-    """Select random non-adjacent positions for missing tiles."""
+def max_missing_tiles(grid_size):
+    """Most non-adjacent tiles a grid can hold (one per 2x2 block)."""
+    return ((grid_size + 1) // 2) ** 2
+
+def select_missing_tiles(positions, num_missing, grid_size, rng=None, attempts=3):
+    """Select random non-adjacent positions for missing tiles.
+
+    Keeps a pool of still-available positions with swap-remove, so each
+    pick and each blocked neighbour costs O(1) and sampling never rejects a
+    candidate. If the random picks paint themselves into a corner, the
+    positions are drawn from a non-adjacent lattice instead. Raises
+    ValueError when the request cannot fit on the grid.
+    """
+    rng = rng or random
+    positions = list(positions)
+    if num_missing > min(len(positions), max_missing_tiles(grid_size)):
+        raise ValueError(
+            f"Cannot place {num_missing} non-adjacent missing tiles on a {grid_size}x{grid_size} grid"
+        )
+
+    for _ in range(attempts):
+        missing_positions = _sample_non_adjacent(positions, num_missing, grid_size, rng)
+        if missing_positions is not None:
+            return missing_positions
+
+    # Every other row and column are never adjacent to each other
+    lattice = [pos for pos in positions
+               if (pos // grid_size) % 2 == 0 and (pos % grid_size) % 2 == 0]
+    if len(lattice) < num_missing:
+        raise ValueError(f"Cannot place {num_missing} non-adjacent missing tiles among the given positions")
+    return rng.sample(lattice, num_missing)
+
+def _sample_non_adjacent(positions, num_missing, grid_size, rng):
+    """One pass of random picks from the availability pool, or None if it runs dry."""
+    pool = list(positions)
+    # Index of each position in the pool, -1 once it is taken or blocked
+    slot = [-1] * (grid_size * grid_size)
+    for i, pos in enumerate(pool):
+        slot[pos] = i
+
+    def remove(pos):
+        i = slot[pos]
+        if i < 0:
+            return
+        last = pool.pop()
+        if last != pos:
+            pool[i] = last
+            slot[last] = i
+        slot[pos] = -1
+
     missing_positions = []
-    
     while len(missing_positions) < num_missing:
-        # Select a random position
-        pos = random.choice(positions)
-        
-        # Check if this position is already selected
-        if pos in missing_positions:
-            continue
-        
-        # Check if any adjacent positions are already selected
-        is_adjacent = False
-        for mp in missing_positions:
-            # Calculate row and column for both positions
-            pos_row, pos_col = pos // grid_size, pos % grid_size
-            mp_row, mp_col = mp // grid_size, mp % grid_size
-            
-            # Check if they're adjacent (horizontally, vertically, or diagonally)
-            if abs(pos_row - mp_row) <= 1 and abs(pos_col - mp_col) <= 1:
-                is_adjacent = True
-                break
-        
-        if not is_adjacent:
-            missing_positions.append(pos)
-    
+        if not pool:
+            return None
+        pos = pool[rng.randrange(len(pool))]
+        missing_positions.append(pos)
+
+        # Block the position and its neighbours (horizontally, vertically, or diagonally)
+        row, col = pos // grid_size, pos % grid_size
+        for n_row in range(max(0, row - 1), min(grid_size, row + 2)):
+            for n_col in range(max(0, col - 1), min(grid_size, col + 2)):
+                remove(n_row * grid_size + n_col)
+
     return missing_positions
 
-def transform_tile(tile):
-    """Apply random transformation (rotation or flip) to a tile."""
-    transformation = random.choice(['rotate_90', 'rotate_-90', 'flip_h', 'flip_v', 'none'])
-    
-    if transformation == 'rotate_90':
-        return cv2.rotate(tile, cv2.ROTATE_90_CLOCKWISE)
-    elif transformation == 'rotate_-90':
-        return cv2.rotate(tile, cv2.ROTATE_90_COUNTERCLOCKWISE)
-    elif transformation == 'flip_h':
-        return cv2.flip(tile, 1)
-    elif transformation == 'flip_v':
-        return cv2.flip(tile, 0)
-    else:
-        return tile  # No transformation
\ No newline at end of file
+# Named transformations a shuffled tile can be given
+TRANSFORMATIONS = ['rotate_90', 'rotate_-90', 'flip_h', 'flip_v', 'none']
+
+def apply_transformation(tile, transformation):
+    """Apply a named transformation (rotation or flip) to a tile."""
+    if transformation not in TRANSFORM_CODES:
+        raise ValueError(f"Unknown tile transformation: {transformation}")
+    return apply_transform(tile, TRANSFORM_CODES[transformation])
+
+def transform_tile(tile, rng=None):
+    """Apply a random transformation to a tile. Returns (tile, transformation)."""
+    transformation = (rng or random).choice(TRANSFORMATIONS)
+    return apply_transformation(tile, transformation), transformation
@@ -0,0 +1,105 @@
+import math
+from utils.config import TRAY_CONFIG
+
+class TrayGeometry:
+    """Slot grid of the tile tray, shared by the atlas image and hit-testing.
+
+    Visible tiles fill a grid of `columns` x `rows` equal slots in reading
+    order. Coordinates are normalized to the tray, (0, 0) being its top-left.
+    """
+
+    def __init__(self, visible_tiles, max_rows=5):
+        self.visible_tiles = tuple(visible_tiles)
+        count = len(self.visible_tiles)
+        self.columns = max(1, math.ceil(count / max_rows))
+        self.rows = max(1, math.ceil(count / self.columns))
+
+    def __len__(self):
+        return len(self.visible_tiles)
+
+    def slot_rect(self, slot):
+        """Normalized (x1, y1, x2, y2) of a slot."""
+        row, col = divmod(slot, self.columns)
+        return (col / self.columns, row / self.rows,
+                (col + 1) / self.columns, (row + 1) / self.rows)
+
+    def tile_at(self, u, v):
+        """Tile index at normalized tray coordinates (u, v), or None."""
+        if not (0 <= u < 1 and 0 <= v < 1):
+            return None
+        slot = int(v * self.rows) * self.columns + int(u * self.columns)
+        if slot < len(self.visible_tiles):
+            return self.visible_tiles[slot]
+        return None
+
+def tray_geometry(tile_count, correct_placements):
+    """Slot grid for the tiles that have not been placed yet."""
+    placed = set(correct_placements.values())
+    visible_tiles = [i for i in range(tile_count) if i not in placed]
+    return TrayGeometry(visible_tiles, TRAY_CONFIG["max_rows"])
+
+class LayoutIndex:
+    """Precomputed screen layout for hit-testing gestures.
+
+    Maps camera coordinates to a tray slot or a board cell with a couple of
+    arithmetic operations. The index only depends on the grid size, the
+    visible tiles and the capture resolution, so it is rebuilt when one of
+    those changes rather than on every pinch frame.
+    """
+
+    # Regions as (x1, y1, x2, y2) in normalized camera coordinates
+    BOARD_REGION = (0.0, 0.0, 0.7, 1.0)
+    TRAY_REGION = (0.7, 0.0, 1.0, 1.0)
+
+    def __init__(self, grid_size, tray, missing_positions, frame_size,
+                 board_region=BOARD_REGION, tray_region=TRAY_REGION):
+        self.grid_size = grid_size
+        self.tray = tray
+        self.missing_positions = frozenset(missing_positions)
+        self.frame_height, self.frame_width = frame_size
+
+        self.board_region = board_region
+        self.tray_region = tray_region
+
+        # Scale factors from pixels to board cells and tray slots
+        bx1, by1, bx2, by2 = board_region
+        self._board_x = (bx1 * self.frame_width, grid_size / ((bx2 - bx1) * self.frame_width))
+        self._board_y = (by1 * self.frame_height, grid_size / ((by2 - by1) * self.frame_height))
+
+        tx1, ty1, tx2, ty2 = tray_region
+        self._tray_x = (tx1 * self.frame_width, 1.0 / ((tx2 - tx1) * self.frame_width))
+        self._tray_y = (ty1 * self.frame_height, 1.0 / ((ty2 - ty1) * self.frame_height))
+
+    @classmethod
+    def from_state(cls, state, frame_size):
+        """Build the index for the current game state and capture size."""
+        grid_size = int(state.game_mode.split('x')[0])
+        puzzle = state.puzzle
+        if puzzle is None:
+            return cls(grid_size, TrayGeometry([]), [], frame_size)
+        # Same slot grid as the tray atlas on screen
+        tray = tray_geometry(len(puzzle), state.correct_placements)
+        return cls(grid_size, tray, puzzle.missing_positions, frame_size)
+
+    def tile_at(self, x, y):
+        """Index of the shuffled tile under pixel (x, y), or None."""
+        x0, x_scale = self._tray_x
+        y0, y_scale = self._tray_y
+        return self.tray.tile_at((x - x0) * x_scale, (y - y0) * y_scale)
+
+    def cell_at(self, x, y):
+        """Board position under pixel (x, y), or None."""
+        x0, x_scale = self._board_x
+        y0, y_scale = self._board_y
+        if x < x0 or y < y0:
+            return None
+
+        col = int((x - x0) * x_scale)
+        row = int((y - y0) * y_scale)
+        if col < self.grid_size and row < self.grid_size:
+            return row * self.grid_size + col
+        return None
+
+    def is_open(self, position):
+        """Whether a board position is one of the missing tiles."""
+        return position in self.missing_positions
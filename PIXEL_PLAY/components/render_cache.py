@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+from utils.metrics import get_metrics
+
+# OpenCV extension and quality flag name for each supported output format,
+# flags are looked up on first encode so importing this module does not load OpenCV
+ENCODERS = {
+    "jpeg": (".jpg", "IMWRITE_JPEG_QUALITY", "image/jpeg"),
+    "webp": (".webp", "IMWRITE_WEBP_QUALITY", "image/webp"),
+    "png": (".png", "IMWRITE_PNG_COMPRESSION", "image/png"),
+}
+
+class EncodedImage:
+    """Encoded image bytes with the metadata needed to display them."""
+
+    __slots__ = ("data", "format", "mimetype", "width", "height")
+
+    def __init__(self, data, image_format, mimetype, width, height):
+        self.data = data
+        self.format = image_format
+        self.mimetype = mimetype
+        self.width = width
+        self.height = height
+
+def encode_image(image, image_format="jpeg", quality=85):
+    """Encode a BGR image into JPEG, WebP or PNG bytes."""
+    import cv2
+    if image_format not in ENCODERS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+
+    extension, quality_flag, mimetype = ENCODERS[image_format]
+    if image_format == "png":
+        # PNG is lossless, map quality 0-100 onto compression level 9-0
+        quality = max(0, min(9, round((100 - quality) / 11)))
+
+    ok, buffer = cv2.imencode(extension, image, [getattr(cv2, quality_flag), int(quality)])
+    if not ok:
+        raise ValueError(f"Could not encode image as {image_format}")
+
+    h, w = image.shape[:2]
+    return EncodedImage(buffer.tobytes(), image_format, mimetype, w, h)
+
+class RenderCache:
+    """Size-bounded LRU cache of encoded images.
+
+    Keys identify what was rendered, e.g. (game_id, "board", version), so an
+    unchanged frame is served from the cache without being encoded again.
+    Entries are evicted least recently used first once `max_bytes` is
+    exceeded.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, image_format="jpeg", quality=85):
+        self.max_bytes = max_bytes
+        self.image_format = image_format
+        self.quality = quality
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Get a cached image and mark it as recently used, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        """Store an encoded image, evicting old entries to stay within budget."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.data)
+
+            # Never keep a single entry that is larger than the whole cache
+            if len(entry.data) > self.max_bytes:
+                return entry
+
+            self._entries[key] = entry
+            self.size += len(entry.data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.data)
+        return entry
+
+    def get_or_encode(self, key, render):
+        """Get the image for `key`, rendering and encoding it on a miss.
+
+        `render` is only called on a miss and must return a BGR image.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            self.misses += 1
+        image = render()
+        with get_metrics().span("encode"):
+            encoded = encode_image(image, self.image_format, self.quality)
+        return self.put(key, encoded)
+
+    def evict_game(self, game_id):
+        """Drop every entry that belongs to a finished game."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == game_id]:
+                self.size -= len(self._entries.pop(key).data)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,49 @@
+import numpy as np
+from utils.config import TRAY_CONFIG
+
+BACKGROUND = (255, 255, 255)
+LABEL_COLOR = (60, 60, 60)
+
+class TileAtlas:
+    """Every visible tray tile composed into a single image.
+
+    Tiles are laid out on the slot grid of a TrayGeometry, each slot being
+    the same size in pixels, so normalized slot coordinates in the atlas are
+    exactly the ones the hand tracker hit-tests against.
+    """
+
+    def __init__(self, tiles, geometry, slot_size=128, padding=8, label_height=20):
+        import cv2
+        self.geometry = geometry
+        self.cell_width = slot_size + 2 * padding
+        self.cell_height = slot_size + 2 * padding + label_height
+
+        self.image = np.full(
+            (geometry.rows * self.cell_height, geometry.columns * self.cell_width, 3),
+            BACKGROUND, dtype=np.uint8
+        )
+
+        for slot, tile_index in enumerate(geometry.visible_tiles):
+            row, col = divmod(slot, geometry.columns)
+            x = col * self.cell_width + padding
+            y = row * self.cell_height + padding
+
+            # Nearest neighbour keeps small tiles crisp when scaled up
+            self.image[y:y + slot_size, x:x + slot_size] = cv2.resize(
+                tiles[tile_index], (slot_size, slot_size), interpolation=cv2.INTER_NEAREST
+            )
+            cv2.putText(self.image, f"Tile {tile_index + 1}", (x, y + slot_size + label_height - 4),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, LABEL_COLOR, 1, cv2.LINE_AA)
+
+def build_tile_atlas(tiles, geometry, slot_size=None):
+    """Compose the visible shuffled tiles into one atlas image.
+
+    `tiles` maps each visible tile index to its pixels.
+    """
+    return TileAtlas(
+        tiles,
+        geometry,
+        slot_size=slot_size or TRAY_CONFIG["slot_size"],
+        padding=TRAY_CONFIG["padding"],
+        label_height=TRAY_CONFIG["label_height"]
+    )
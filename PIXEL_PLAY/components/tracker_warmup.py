@@ -0,0 +1,46 @@
+"""Background warm-up of the hand tracker while the mode selection page is shown.
+
+This module only needs the standard library, so the first page can start
+the warm-up without importing OpenCV, MediaPipe or the camera stack on its
+script thread. The warm-up thread imports them itself.
+"""
+import threading
+from utils.config import CAMERA_CONFIG
+
+_warm_tracker = None
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+def warm_up_tracker():
+    """Load MediaPipe and build a hand tracker in the background, once per process."""
+    global _warmup_thread
+    with _warmup_lock:
+        # The camera broker runs its own tracker
+        if _warmup_thread is None and not CAMERA_CONFIG["broker"]:
+            _warmup_thread = threading.Thread(target=_build_warm_tracker, name="tracker-warmup", daemon=True)
+            _warmup_thread.start()
+
+def _build_warm_tracker():
+    global _warm_tracker
+    try:
+        from components.hand_tracker import HandTracker
+        tracker = HandTracker()
+    except Exception:
+        # The same error is raised again when the camera starts
+        return
+    with _warmup_lock:
+        _warm_tracker = tracker
+
+def create_tracker():
+    """Take the warmed-up hand tracker, or build one if there is none."""
+    global _warm_tracker
+    thread = _warmup_thread
+    if thread is not None:
+        # Finishing the warm-up is faster than starting a second graph
+        thread.join()
+    with _warmup_lock:
+        tracker, _warm_tracker = _warm_tracker, None
+    if tracker is None:
+        from components.hand_tracker import HandTracker
+        tracker = HandTracker()
+    return tracker
@@ -0,0 +1,110 @@
+import uuid
+from utils.config import SCORING
+
+class GameState:
+    """All the state of one game, without any Streamlit dependency.
+
+    The rules below work on any object with these attributes, so the
+    Streamlit front end passes st.session_state and the simulator passes
+    GameState instances.
+    """
+
+    __slots__ = ("game_mode", "game_id", "puzzle", "correct_placements", "state_version",
+                 "selected_tile", "score", "attempts", "game_over", "game_won")
+
+    def __init__(self, game_mode, puzzle, game_id=None):
+        self.game_mode = game_mode
+        self.game_id = game_id or uuid.uuid4().hex
+        self.puzzle = puzzle
+        self.correct_placements = {}  # Board position -> tray tile index
+        self.state_version = 0
+        self.selected_tile = None  # Tray tile index picked up by a pinch
+        self.score = 0
+        self.attempts = 0
+        self.game_over = False
+        self.game_won = False
+
+def new_game(game_mode, puzzle, state=None):
+    """Start a game of a puzzle, in `state` or a new GameState."""
+    if state is None:
+        return GameState(game_mode, puzzle)
+    state.game_mode = game_mode
+    state.game_id = uuid.uuid4().hex
+    state.puzzle = puzzle
+    state.correct_placements = {}
+    state.state_version = 0
+    state.selected_tile = None
+    state.score = 0
+    state.attempts = 0
+    state.game_over = False
+    state.game_won = False
+    return state
+
+def is_correct(puzzle, tile_index, position):
+    """Whether tray tile `tile_index` belongs at board `position`."""
+    return puzzle.order[tile_index] == position
+
+def place_tile(state, tile_index, position, correct=None, scoring=SCORING):
+    """Apply one placement to the game state and return whether it was correct."""
+    if correct is None:
+        correct = is_correct(state.puzzle, tile_index, position)
+
+    state.attempts += 1
+    state.state_version += 1
+
+    if correct:
+        state.score += scoring["correct_placement"]
+        # Mark tile as correctly placed, which also removes it from the tray
+        state.correct_placements[position] = tile_index
+        if len(state.correct_placements) == len(state.puzzle.missing_positions):
+            state.game_over = True
+            state.game_won = True
+    else:
+        # The penalty never takes the score below zero
+        state.score = max(0, state.score + scoring["incorrect_placement"])
+    return correct
+
+def remaining_tiles(state):
+    """Tray tile indices that have not been placed yet."""
+    placed = set(state.correct_placements.values())
+    return [i for i in range(len(state.puzzle)) if i not in placed]
+
+def open_positions(puzzle, correct_placements):
+    """Board positions of a puzzle still waiting for their tile."""
+    return [p for p in puzzle.missing_positions if p not in correct_placements]
+
+def final_score(base_score, attempts, time_taken, time_limit=None, scoring=SCORING):
+    """Score of a finished game, with the attempt penalty, time bonus and completion bonus."""
+    # 5 points per additional attempt
+    score = base_score - max(0, attempts - 1) * 5
+
+    if time_limit is not None:
+        score += max(0, time_limit - time_taken) * scoring["time_bonus"]
+
+    score += scoring["completion_bonus"]
+    return max(0, score)
+
+def to_dict(state):
+    """Snapshot of a game as a plain dict that can be stored as JSON."""
+    return {
+        "game_mode": state.game_mode,
+        "puzzle": state.puzzle.to_dict(),
+        "correct_placements": sorted(state.correct_placements.items()),
+        "score": state.score,
+        "attempts": state.attempts,
+    }
+
+def from_dict(snapshot, state=None):
+    """Continue a game saved with `to_dict`, in `state` or a new GameState."""
+    # Imported here so the rules load without the image and rendering modules
+    from game.puzzle_generator import PuzzleDescriptor
+
+    puzzle = PuzzleDescriptor.from_dict(snapshot["puzzle"])
+    # A fresh id, so nothing cached for an earlier copy of this game is reused
+    state = new_game(snapshot["game_mode"], puzzle, state)
+    state.correct_placements = {position: tile_index for position, tile_index in snapshot["correct_placements"]}
+    state.score = snapshot["score"]
+    state.attempts = snapshot["attempts"]
+    state.game_won = len(state.correct_placements) == len(puzzle.missing_positions)
+    state.game_over = state.game_won
+    return state
@@ -1,62 +1,38 @@
 import streamlit as st
-import random
-from game.puzzle_generator import get_random_image, create_puzzle
+from game import engine
+from game.puzzle_pool import get_puzzle_pool
+
+# Streamlit front end of game.engine: the rules act directly on st.session_state
 
 def initialize_game(game_mode, num_missing_tiles):
     """Initialize a new game with the selected mode."""
-    # Get grid size from game mode (e.g., "8x8", "16x16", "24x24")
-    grid_size = int(game_mode.split('x')[0])
-    
-    # Choose a random image and create the puzzle
-    image_path = get_random_image()
-    puzzle_img, puzzle_tiles, missing_positions, shuffled_tiles = create_puzzle(
-        image_path, grid_size, num_missing_tiles
-    )
-    
-    # Store game state in session state
-    st.session_state.puzzle_image = puzzle_img
-    st.session_state.puzzle_tiles = puzzle_tiles
-    st.session_state.missing_positions = missing_positions
-    st.session_state.shuffled_tiles = shuffled_tiles
-    st.session_state.correct_placements = {}  # Map of correctly placed tiles
-    
-    # Reset game stats
-    st.session_state.score = 0
-    st.session_state.attempts = 0
-    
+    # Take a pre-generated puzzle, built on the spot if none is ready
+    puzzle = get_puzzle_pool().take(game_mode, num_missing_tiles)
+
+    # Pixels are derived from the descriptor on demand, the game id and
+    # state version let derived data be cached
+    engine.new_game(game_mode, puzzle, st.session_state)
+
     # Game is now initialized
     st.session_state.game_initialized = True
-    st.session_state.game_over = False
-    st.session_state.game_won = False
 
-def check_tile_placement(tile_index, position):
+def check_tile_placement(tile_index, position, state=None):
     """Check if a tile is correctly placed."""
-    # Get the original position of the tile
-    original_position = st.session_state.shuffled_tiles[tile_index]['original_position']
-    
-    # Check if this is the correct position
-    return original_position == position
+    state = st.session_state if state is None else state
+    return engine.is_correct(state.puzzle, tile_index, position)
 
-def update_game_state(tile_index, position, correct):
+def update_game_state(tile_index, position, correct, state=None):
     """Update the game state after a tile placement."""
-    # Increment attempts
-    st.session_state.attempts += 1
-    
-    if correct:
-        # Update score
-        st.session_state.score += 100
-        
-        # Mark tile as correctly placed
-        st.session_state.correct_placements[position] = tile_index
-        
-        # Hide tile from shuffled tiles
-        st.session_state.shuffled_tiles[tile_index]['visible'] = False
-        
-        # Check if all tiles are placed correctly
-        if len(st.session_state.correct_placements) == len(st.session_state.missing_positions):
-            # Game completed
-            st.session_state.game_over = True
-            st.session_state.game_won = True
-    else:
-        # Incorrect placement, penalize score
-        st.session_state.score = max(0, st.session_state.score - 10)
\ No newline at end of file
+    state = st.session_state if state is None else state
+    engine.place_tile(state, tile_index, position, correct)
+
+def save_game(state=None):
+    """Snapshot of the current game as a plain dict that can be stored as JSON."""
+    state = st.session_state if state is None else state
+    return engine.to_dict(state)
+
+def restore_game(snapshot, state=None):
+    """Continue a game saved with `save_game`."""
+    state = st.session_state if state is None else state
+    engine.from_dict(snapshot, state)
+    state.game_initialized = True
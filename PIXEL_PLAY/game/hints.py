@@ -0,0 +1,129 @@
+"""Hints: where a tray tile fits and how it is turned, from the seams it would make.
+
+A tile is scored against every open slot in all 8 orientations at once.
+Each side of a candidate is compared with the facing side of the filled
+neighbour across the seam, predicting each side's edge pixels by
+extrapolating the gradient of the other. Smooth seams give low errors, so
+the correct slot and orientation come out on top even for tiles that look
+alike.
+"""
+import numpy as np
+from components.image_processor import split_image_into_tiles
+from components.tile_transforms import TRANSFORM_COUNT, apply_transforms
+from game.engine import open_positions
+from game.puzzle_generator import load_puzzle_image, render_tile
+
+# Tile sides and the (row, col) offset of the neighbour across each of them
+UP, RIGHT, DOWN, LEFT = range(4)
+OFFSETS = np.array([(-1, 0), (0, 1), (1, 0), (0, -1)])
+
+ROTATIONS = ["no rotation", "rotate 90° clockwise", "rotate 180°", "rotate 90° counter-clockwise"]
+
+def side_lines(stack):
+    """Edge and next-to-edge pixel lines of each side of a (N, s, s, 3) stack.
+
+    Returns (N, 4, 2, s, 3) float32, sides in UP, RIGHT, DOWN, LEFT order.
+    Lines run left to right or top to bottom, so facing sides of two
+    neighbours line up pixel for pixel.
+    """
+    stack = stack.astype(np.float32)
+    return np.stack([
+        stack[:, [0, 1]],
+        stack[:, :, [-1, -2]].swapaxes(1, 2),
+        stack[:, [-1, -2]],
+        stack[:, :, [0, 1]].swapaxes(1, 2),
+    ], axis=1)
+
+def slot_context(image, grid_size, slots, open_slots):
+    """Lines of the filled neighbours facing each side of each slot.
+
+    Returns (S, 4, 2, s, 3) lines, nearest line first, and an (S, 4) mask
+    of the sides that have a filled neighbour.
+    """
+    tiles, _ = split_image_into_tiles(image, grid_size)
+    view = tiles.view
+    slots = np.asarray(slots)
+    rows, cols = np.divmod(slots, grid_size)
+
+    neighbour_rows = rows[:, None] + OFFSETS[:, 0]
+    neighbour_cols = cols[:, None] + OFFSETS[:, 1]
+    mask = ((neighbour_rows >= 0) & (neighbour_rows < grid_size)
+            & (neighbour_cols >= 0) & (neighbour_cols < grid_size))
+    neighbours = neighbour_rows * grid_size + neighbour_cols
+    mask &= ~np.isin(neighbours, list(open_slots))
+    neighbour_rows = np.clip(neighbour_rows, 0, grid_size - 1)
+    neighbour_cols = np.clip(neighbour_cols, 0, grid_size - 1)
+
+    # The neighbour above faces the slot with its bottom lines, and so on
+    above = view[neighbour_rows[:, UP], neighbour_cols[:, UP]]
+    right = view[neighbour_rows[:, RIGHT], neighbour_cols[:, RIGHT]]
+    below = view[neighbour_rows[:, DOWN], neighbour_cols[:, DOWN]]
+    left = view[neighbour_rows[:, LEFT], neighbour_cols[:, LEFT]]
+    lines = np.stack([
+        above[:, [-1, -2]],
+        right[:, :, [0, 1]].swapaxes(1, 2),
+        below[:, [0, 1]],
+        left[:, :, [-1, -2]].swapaxes(1, 2),
+    ], axis=1).astype(np.float32)
+    return lines, mask
+
+def seam_errors(candidates, context, mask):
+    """Mean seam error of every candidate in every slot.
+
+    candidates: (C, 4, 2, s, 3) side lines of the oriented tile, context and
+    mask from `slot_context`. Each side's edge is compared with the value
+    extrapolated from the two lines across the seam, in both directions.
+    Returns (S, C) errors, inf for slots without any filled neighbour.
+    """
+    tile_edge, tile_inner = candidates[:, :, 0], candidates[:, :, 1]
+    slot_edge, slot_inner = context[:, :, 0], context[:, :, 1]
+
+    from_slot = 2 * slot_edge - slot_inner
+    from_tile = 2 * tile_edge - tile_inner
+    errors = (np.square(tile_edge[None] - from_slot[:, None]).mean(axis=(-2, -1))
+              + np.square(slot_edge[:, None] - from_tile[None]).mean(axis=(-2, -1)))
+
+    sides = mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = (errors * mask[:, None, :]).sum(axis=2) / sides[:, None]
+    scores[sides == 0] = np.inf
+    return scores
+
+def rank_slots(puzzle, tile_index, correct_placements=None, image=None, limit=None):
+    """Rank the open slots for tray tile `tile_index`, best first.
+
+    Returns (position, code, error) tuples, where `code` is the dihedral
+    transform (see components.tile_transforms) that turns the tile as it
+    is shown in the tray back into place.
+    """
+    if image is None:
+        image = load_puzzle_image(puzzle)
+    slots = open_positions(puzzle, correct_placements or {})
+    if not slots:
+        return []
+
+    tile = render_tile(puzzle, tile_index, image)
+    if tile.shape[0] != tile.shape[1]:
+        raise ValueError("Hints need square tiles")
+    codes = np.arange(TRANSFORM_COUNT)
+    oriented = apply_transforms(np.repeat(tile[np.newaxis], TRANSFORM_COUNT, axis=0), codes)
+
+    context, mask = slot_context(image, puzzle.grid_size, slots, slots)
+    scores = seam_errors(side_lines(oriented), context, mask)
+
+    # Best orientation per slot, then slots by their best error
+    best_codes = scores.argmin(axis=1)
+    best_scores = scores[np.arange(len(slots)), best_codes]
+    order = np.argsort(best_scores, kind="stable")[:limit]
+    return [(slots[i], int(best_codes[i]), float(best_scores[i])) for i in order]
+
+def hint(puzzle, tile_index, correct_placements=None, image=None):
+    """Best (position, code, error) for a tray tile, or None if no slot is open."""
+    ranked = rank_slots(puzzle, tile_index, correct_placements, image, limit=1)
+    return ranked[0] if ranked else None
+
+def describe_transform(code):
+    """How to turn a tile for a transform code, in words."""
+    code = int(code)
+    rotation = ROTATIONS[code & 3]
+    return f"mirror left to right, then {rotation}" if code & 4 else rotation
@@ -0,0 +1,253 @@
+import bisect
+import hashlib
+import json
+import os
+import random
+import threading
+from collections import deque
+from PIL import Image
+from utils.config import IMAGE_LIBRARY
+
+# File extensions accepted as puzzle images
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Manifest layout version, an older manifest is rebuilt from scratch
+MANIFEST_VERSION = 1
+
+def hash_file(path, chunk_size=1 << 20):
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _write_json(path, data):
+    """Write a JSON file atomically, so a concurrent reader never sees a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+class ImageLibrary:
+    """Persistent index of the puzzle images on disk.
+
+    The manifest stores the dimensions, a content hash and a thumbnail for
+    every image. A refresh costs a single stat of the image directory while
+    its mtime is unchanged, and otherwise only re-reads files whose size or
+    mtime changed, so the cost of starting a game does not grow with the
+    library. Images replaced in place without touching the directory are
+    picked up by `refresh(force=True)`.
+    """
+
+    def __init__(self, image_dir, manifest_path, thumbnail_dir,
+                 thumbnail_size=(128, 128), recent_games=10):
+        self.image_dir = image_dir
+        self.manifest_path = manifest_path
+        # Recently played images change every game, keep them out of the big manifest
+        self.recent_path = os.path.splitext(manifest_path)[0] + "_recent.json"
+        self.thumbnail_dir = thumbnail_dir
+        self.thumbnail_size = tuple(thumbnail_size)
+
+        self.entries = {}  # File name -> manifest entry
+        self.recent = deque(maxlen=recent_games)  # Names of recently played images
+        self._dir_mtime = None
+        self._lock = threading.Lock()
+
+        # Derived lookups, rebuilt whenever the entries change
+        self._paths = ()
+        self._names = ()
+        self._by_hash = {}  # Content hash -> name
+        self._by_aspect = []  # Sorted (aspect ratio, name)
+
+        self._load_manifest()
+        self._load_recent()
+
+    def __len__(self):
+        self.refresh()
+        return len(self._names)
+
+    def _load_manifest(self):
+        """Load the manifest written by a previous run, if any."""
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if manifest.get("version") != MANIFEST_VERSION:
+            return
+        self.entries = manifest.get("images", {})
+        self._dir_mtime = manifest.get("dir_mtime")
+        self._rebuild_lookups()
+
+    def _load_recent(self):
+        """Load the recently played images saved by a previous run, if any."""
+        try:
+            with open(self.recent_path) as f:
+                self.recent.extend(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def _save_manifest(self):
+        """Write the manifest."""
+        _write_json(self.manifest_path, {
+            "version": MANIFEST_VERSION,
+            "dir_mtime": self._dir_mtime,
+            "images": self.entries,
+        })
+
+    def _rebuild_lookups(self):
+        """Recompute the sorted path list and the aspect ratio index."""
+        names = sorted(self.entries)
+        self._names = tuple(names)
+        self._paths = tuple(os.path.join(self.image_dir, name) for name in names)
+        self._by_aspect = sorted((self.entries[name]["aspect"], name) for name in names)
+        self._by_hash = {self.entries[name]["hash"]: name for name in names}
+
+    def refresh(self, force=False):
+        """Bring the manifest up to date with the image directory.
+
+        Returns True if anything changed.
+        """
+        with self._lock:
+            os.makedirs(self.image_dir, exist_ok=True)
+            dir_mtime = os.stat(self.image_dir).st_mtime_ns
+            if dir_mtime == self._dir_mtime and not force:
+                return False
+
+            changed = False
+            seen = set()
+            with os.scandir(self.image_dir) as it:
+                for item in it:
+                    if not item.name.lower().endswith(IMAGE_EXTENSIONS) or not item.is_file():
+                        continue
+                    seen.add(item.name)
+
+                    stat = item.stat()
+                    entry = self.entries.get(item.name)
+                    if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                        continue
+
+                    # New or modified image, index it again
+                    entry = self._index_image(item.path, stat)
+                    if entry is None:
+                        self.entries.pop(item.name, None)
+                    else:
+                        self.entries[item.name] = entry
+                    changed = True
+
+            # Forget images that were removed from the directory
+            for name in set(self.entries) - seen:
+                del self.entries[name]
+                changed = True
+
+            self._dir_mtime = dir_mtime
+            if changed:
+                self._rebuild_lookups()
+            self._save_manifest()
+            return changed
+
+    def _index_image(self, path, stat):
+        """Read the dimensions, hash and thumbnail of one image, or None if unreadable."""
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+                # Let the JPEG decoder downscale while decoding the thumbnail
+                img.draft('RGB', self.thumbnail_size)
+                img = img.convert('RGB')
+                img.thumbnail(self.thumbnail_size)
+
+                content_hash = hash_file(path)
+                os.makedirs(self.thumbnail_dir, exist_ok=True)
+                thumbnail = os.path.join(self.thumbnail_dir, f"{content_hash}.jpg")
+                if not os.path.exists(thumbnail):
+                    img.save(thumbnail, 'JPEG', quality=85)
+        except OSError:
+            return None
+
+        return {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "width": width,
+            "height": height,
+            "aspect": round(width / height, 4),
+            "hash": content_hash,
+            "thumbnail": thumbnail,
+        }
+
+    def paths(self):
+        """Paths of all indexed images, sorted by file name."""
+        self.refresh()
+        return self._paths
+
+    def entry(self, image_path):
+        """Manifest entry of an image path, or None."""
+        return self.entries.get(os.path.basename(image_path))
+
+    def path_for(self, image_id):
+        """Current path of the image with a given content hash, or None."""
+        self.refresh()
+        name = self._by_hash.get(image_id)
+        return None if name is None else os.path.join(self.image_dir, name)
+
+    def choose(self, aspect_ratio=None, tolerance=0.15, avoid_recent=True, rng=None):
+        """Pick a random image path, optionally filtered.
+
+        `aspect_ratio` keeps images whose width / height is within
+        `tolerance` of it. With `avoid_recent`, images played in the last
+        few games are skipped unless nothing else matches. Returns None if
+        the library is empty or no image has a matching aspect ratio.
+        """
+        self.refresh()
+        rng = rng or random
+
+        with self._lock:
+            if aspect_ratio is None:
+                lo, hi = 0, len(self._by_aspect)
+            else:
+                lo = bisect.bisect_left(self._by_aspect, (aspect_ratio - tolerance, ""))
+                hi = bisect.bisect_right(self._by_aspect, (aspect_ratio + tolerance, "\uffff"))
+            if lo >= hi:
+                return None
+
+            recent = set(self.recent) if avoid_recent else set()
+            for _ in range(len(recent) + 1):
+                name = self._by_aspect[rng.randrange(lo, hi)][1]
+                if name not in recent:
+                    break
+            else:
+                # Only scan the matching range when random picks kept hitting
+                # recently played images
+                candidates = [n for _, n in self._by_aspect[lo:hi] if n not in recent]
+                if candidates:
+                    name = rng.choice(candidates)
+
+        return os.path.join(self.image_dir, name)
+
+    def mark_played(self, image_path):
+        """Remember that an image was just played."""
+        name = os.path.basename(image_path)
+        with self._lock:
+            if name in self.recent:
+                self.recent.remove(name)
+            self.recent.append(name)
+            _write_json(self.recent_path, list(self.recent))
+
+_image_library = None
+_image_library_lock = threading.Lock()
+
+def get_image_library():
+    """Get the process-wide image library."""
+    global _image_library
+    with _image_library_lock:
+        if _image_library is None:
+            _image_library = ImageLibrary(
+                IMAGE_LIBRARY["dir"],
+                IMAGE_LIBRARY["manifest"],
+                IMAGE_LIBRARY["thumbnail_dir"],
+                thumbnail_size=IMAGE_LIBRARY["thumbnail_size"],
+                recent_games=IMAGE_LIBRARY["recent_games"],
+            )
+        return _image_library
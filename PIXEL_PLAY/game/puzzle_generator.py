@@ -1,67 +1,121 @@
-import os
 import random
-import cv2
-import numpy as np
+from components.image_cache import get_image_cache
 from components.image_processor import (
-    load_and_resize_image, 
     split_image_into_tiles, 
-    select_missing_tiles,
-    transform_tile
+    select_missing_tiles
 )
+from components.tile_transforms import TRANSFORM_CODES, TRANSFORM_COUNT, apply_transform, apply_transforms
+from game.image_library import get_image_library, hash_file
+from utils.config import IMAGE_CACHE, IMAGE_LIBRARY
 
 def get_available_images():
     """Get a list of all available images in the assets directory."""
-    image_dir = os.path.join("assets", "images")
-    
-    # Create directory if it doesn't exist
-    if not os.path.exists(image_dir):
-        os.makedirs(image_dir)
-        
-    # Get all image files
-    image_files = []
-    for file in os.listdir(image_dir):
-        if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-            image_files.append(os.path.join(image_dir, file))
-    
-    return image_files
+    # The library only rescans the directory when its contents changed
+    return list(get_image_library().paths())
 
 def get_random_image():
     """Get a random image from the available images."""
-    images = get_available_images()
-    if not images:
+    library = get_image_library()
+    image_path = library.choose(
+        aspect_ratio=IMAGE_LIBRARY["aspect_ratio"],
+        tolerance=IMAGE_LIBRARY["aspect_tolerance"]
+    )
+    if image_path is None:
         raise FileNotFoundError("No images found in the assets/images directory.")
-    
-    return random.choice(images)
+    return image_path
+
+class PuzzleDescriptor:
+    """Everything needed to rebuild a puzzle, without any pixels.
+
+    Tray tile `i` is the board tile at `order[i]`, shown with the dihedral
+    transform code `transforms[i]` (see components.tile_transforms). The image is referenced by its content
+    hash, and pixels are derived on demand from the shared image cache, so
+    a descriptor is a few hundred bytes and can be saved with `to_dict`.
+    """
+
+    __slots__ = ("image_id", "image_path", "grid_size", "seed",
+                 "missing_positions", "order", "transforms")
+
+    def __init__(self, image_id, image_path, grid_size, seed, missing_positions, order, transforms):
+        self.image_id = image_id
+        self.image_path = image_path
+        self.grid_size = grid_size
+        self.seed = seed
+        self.missing_positions = tuple(missing_positions)
+        self.order = tuple(order)
+        self.transforms = tuple(transforms)
 
-def create_puzzle(image_path, grid_size, num_missing_tiles):
-    """Create a puzzle from the given image."""
-    # Load and resize the image
-    image = load_and_resize_image(image_path)
+    def __len__(self):
+        return len(self.order)
+
+    def to_dict(self):
+        """Plain dict that can be stored as JSON."""
+        return {
+            "image_id": self.image_id,
+            "image_path": self.image_path,
+            "grid_size": self.grid_size,
+            "seed": self.seed,
+            "missing_positions": list(self.missing_positions),
+            "order": list(self.order),
+            "transforms": list(self.transforms),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a descriptor saved with `to_dict`."""
+        fields = {slot: data[slot] for slot in cls.__slots__}
+        # Older snapshots name their transforms ('rotate_90') instead of using codes
+        fields["transforms"] = [TRANSFORM_CODES[t] if isinstance(t, str) else t for t in fields["transforms"]]
+        return cls(**fields)
+
+def create_puzzle(image_path, grid_size, num_missing_tiles, seed=None):
+    """Create a puzzle descriptor for the given image.
+
+    The same image, grid size, tile count and seed always give the same puzzle.
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    rng = random.Random(seed)
     
-    # Split the image into tiles
-    tiles, positions = split_image_into_tiles(image, grid_size)
+    # Identify the image by content, so a renamed file still resolves
+    entry = get_image_library().entry(image_path)
+    image_id = entry["hash"] if entry else hash_file(image_path)
     
     # Select positions for missing tiles
-    missing_positions = select_missing_tiles(positions, num_missing_tiles, grid_size)
+    positions = range(grid_size * grid_size)
+    missing_positions = select_missing_tiles(positions, num_missing_tiles, grid_size, rng=rng)
     
-    # Create shuffled tiles for the user to place
-    shuffled_tiles = []
-    for pos in missing_positions:
-        # Get the tile at this position
-        tile = tiles[pos].copy()
-        
-        # Apply random transformation
-        transformed_tile = transform_tile(tile)
-        
-        # Add to shuffled tiles
-        shuffled_tiles.append({
-            'image': transformed_tile,
-            'original_position': pos,
-            'visible': True,
-            'transformation': 'random'  # For demonstration purposes
-        })
+    # Shuffle the tiles to randomize their order, and pick one of the 8 rotations and flips for each
+    order = list(missing_positions)
+    rng.shuffle(order)
+    transforms = [rng.randrange(TRANSFORM_COUNT) for _ in order]
     
-    # Shuffle the tiles to randomize their order
-    random.shuffle(shuffled_tiles)
+    return PuzzleDescriptor(image_id, image_path, grid_size, seed, missing_positions, order, transforms)
+
+def load_puzzle_image(puzzle):
+    """Get the resized puzzle image from the shared image cache."""
+    image_path = puzzle.image_path
+    entry = get_image_library().entry(image_path)
+    if entry is not None and entry["hash"] != puzzle.image_id:
+        # The file was replaced, look for the image by content instead
+        image_path = get_image_library().path_for(puzzle.image_id)
+        if image_path is None:
+            raise FileNotFoundError(f"Puzzle image {puzzle.image_id} is no longer available")
     
-    return image, tiles, missing_positions, shuffled_tiles
\ No newline at end of file
+    # Decoded only the first time it is used
+    return get_image_cache().get(image_path, IMAGE_CACHE["target_size"])
+
+def render_tile(puzzle, tile_index, image=None):
+    """Pixels of a tray tile, cut from the puzzle image and transformed."""
+    if image is None:
+        image = load_puzzle_image(puzzle)
+    tiles, _ = split_image_into_tiles(image, puzzle.grid_size)
+    return apply_transform(tiles[puzzle.order[tile_index]], puzzle.transforms[tile_index])
+
+def render_tiles(puzzle, tile_indices, image=None):
+    """Pixels of several tray tiles as one (N, h, w, 3) stack, transformed in a batch."""
+    if image is None:
+        image = load_puzzle_image(puzzle)
+    tiles, _ = split_image_into_tiles(image, puzzle.grid_size)
+    stack = tiles.take([puzzle.order[i] for i in tile_indices])
+    return apply_transforms(stack, [puzzle.transforms[i] for i in tile_indices])
@@ -0,0 +1,148 @@
+import atexit
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from game.image_library import get_image_library
+from game.puzzle_generator import get_random_image, create_puzzle, load_puzzle_image
+from utils.config import GAME_MODES, MISSING_TILES, PUZZLE_POOL
+
+def generate_puzzle(grid_size, num_missing_tiles):
+    """Pick a random image and build a puzzle from it."""
+    image_path = get_random_image()
+    puzzle = create_puzzle(image_path, grid_size, num_missing_tiles)
+    # Decode the image now, so the first render finds it in the image cache
+    load_puzzle_image(puzzle)
+    return puzzle
+
+def _lower_priority(nice):
+    """Lower the scheduling priority of the calling worker thread."""
+    try:
+        # On Linux a thread id passed to setpriority only affects that thread
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+    except (AttributeError, OSError):
+        pass
+
+class PuzzlePool:
+    """Ready-made puzzles for each game mode, generated in the background.
+
+    Each mode keeps up to `depth` puzzles. Taking one below `low_watermark`
+    schedules enough background work to fill the mode up again. Workers run
+    at a lower priority than the camera threads, and a mode with nothing
+    ready falls back to generating synchronously.
+    """
+
+    def __init__(self, modes, depth=2, low_watermark=1, workers=1, nice=10):
+        self.depth = depth
+        self.low_watermark = low_watermark
+        self.modes = {mode: MISSING_TILES[mode] for mode in modes}
+
+        self._ready = {mode: deque() for mode in self.modes}
+        self._pending = {mode: 0 for mode in self.modes}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="puzzle-pool",
+            initializer=_lower_priority,
+            initargs=(nice,)
+        )
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.last_error = None
+
+    def start(self):
+        """Fill every mode up to the pool depth."""
+        for mode in self.modes:
+            self._refill(mode)
+        return self
+
+    def ready(self, mode):
+        """Number of puzzles ready for a mode."""
+        with self._lock:
+            return len(self._ready.get(mode, ()))
+
+    def take(self, mode, num_missing_tiles=None):
+        """Get a puzzle for a mode, generating it now if none is ready.
+
+        Returns a PuzzleDescriptor. A tile count other than
+        the configured one for the mode bypasses the pool.
+        """
+        grid_size = int(mode.split('x')[0])
+        if num_missing_tiles is None:
+            num_missing_tiles = self.modes.get(mode, MISSING_TILES.get(mode))
+
+        puzzle = None
+        if self.modes.get(mode) == num_missing_tiles:
+            with self._lock:
+                if self._ready[mode]:
+                    puzzle = self._ready[mode].popleft()
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            self._refill(mode)
+
+        if puzzle is None:
+            puzzle = generate_puzzle(grid_size, num_missing_tiles)
+
+        # Only a puzzle handed to a player counts as played, not one waiting in the pool
+        get_image_library().mark_played(puzzle.image_path)
+        return puzzle
+
+    def _refill(self, mode):
+        """Schedule background work if a mode fell below the low watermark."""
+        with self._lock:
+            if self._closed:
+                return
+            available = len(self._ready[mode]) + self._pending[mode]
+            if available > self.low_watermark:
+                return
+            missing = self.depth - available
+            self._pending[mode] += max(0, missing)
+
+        grid_size = int(mode.split('x')[0])
+        for _ in range(missing):
+            future = self._executor.submit(generate_puzzle, grid_size, self.modes[mode])
+            future.add_done_callback(lambda f, mode=mode: self._on_generated(mode, f))
+
+    def _on_generated(self, mode, future):
+        """Store a finished puzzle, or remember why generation failed."""
+        with self._lock:
+            self._pending[mode] -= 1
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                # Do not retry here, the next take() falls back to a synchronous
+                # build that reports the error to the player
+                self.last_error = error
+                return
+            if len(self._ready[mode]) < self.depth:
+                self._ready[mode].append(future.result())
+
+    def close(self):
+        """Stop the workers and drop queued puzzles."""
+        with self._lock:
+            self._closed = True
+            for ready in self._ready.values():
+                ready.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_puzzle_pool = None
+_puzzle_pool_lock = threading.Lock()
+
+def get_puzzle_pool():
+    """Get the process-wide puzzle pool, starting it on first use."""
+    global _puzzle_pool
+    with _puzzle_pool_lock:
+        if _puzzle_pool is None:
+            _puzzle_pool = PuzzlePool(
+                GAME_MODES,
+                depth=PUZZLE_POOL["depth"],
+                low_watermark=PUZZLE_POOL["low_watermark"],
+                workers=PUZZLE_POOL["workers"],
+                nice=PUZZLE_POOL["nice"]
+            ).start()
+            atexit.register(_puzzle_pool.close)
+        return _puzzle_pool
@@ -0,0 +1,175 @@
+import os
+import threading
+import numpy as np
+
+class FenwickCounts:
+    """Counts of integer scores in a Fenwick tree, one bucket per point.
+
+    Adding a score and counting the scores above a value are O(log max
+    score), so rank queries stay sub-millisecond whatever the number of
+    games. The tree doubles in size when a larger score comes in.
+    """
+
+    def __init__(self, size=1024):
+        self.tree = np.zeros(max(1, size) + 1, dtype=np.int64)
+        self.total = 0
+
+    @property
+    def size(self):
+        return len(self.tree) - 1
+
+    @classmethod
+    def from_counts(cls, counts):
+        """Build a tree from per-score counts in O(size)."""
+        fenwick = cls(len(counts))
+        tree = fenwick.tree
+        tree[1:] = counts
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        fenwick.total = int(np.sum(counts))
+        return fenwick
+
+    def counts(self):
+        """Per-score counts, the inverse of `from_counts`."""
+        counts = self.tree[1:].copy()
+        for i in range(len(counts), 0, -1):
+            parent = i + (i & -i)
+            if parent <= len(counts):
+                counts[parent - 1] -= counts[i - 1]
+        return counts
+
+    def _grow(self, score):
+        """Make room for `score`, rebuilding the tree at a power-of-two size."""
+        size = self.size
+        while size <= score:
+            size *= 2
+        counts = np.zeros(size, dtype=np.int64)
+        counts[:self.size] = self.counts()
+        self.tree = FenwickCounts.from_counts(counts).tree
+
+    def add(self, score, count=1):
+        """Record `count` games with `score` points."""
+        score = max(0, int(score))
+        if score >= self.size:
+            self._grow(score)
+        i = score + 1
+        tree = self.tree
+        while i < len(tree):
+            tree[i] += count
+            i += i & -i
+        self.total += count
+
+    def count_at_most(self, score):
+        """Number of recorded scores <= score."""
+        if score < 0:
+            return 0
+        i = min(int(score), self.size - 1) + 1
+        total = 0
+        tree = self.tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return int(total)
+
+    def rank(self, score):
+        """1-based rank of `score`, ties sharing the best rank."""
+        # Scores are stored clamped to 0, so they are looked up the same way
+        score = max(0, int(score))
+        return self.total - self.count_at_most(score) + 1
+
+    def percentile(self, score):
+        """Percentage of recorded scores strictly below `score`.
+
+        Ties and the game that scored `score` itself are not counted, so
+        this is the share of games the score actually beat.
+        """
+        if self.total == 0:
+            return 0.0
+        score = max(0, int(score))
+        return 100.0 * self.count_at_most(score - 1) / self.total
+
+    def kth_highest(self, k):
+        """The k-th highest recorded score (1-based), or None."""
+        if not 1 <= k <= self.total:
+            return None
+        # Walk down the tree for the smallest score with more than total - k scores at or below it
+        target = self.total - k
+        pos = 0
+        step = 1 << (self.size.bit_length() - 1)
+        tree = self.tree
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+    def top(self, k):
+        """The k highest recorded scores, best first."""
+        return [self.kth_highest(i) for i in range(1, min(k, self.total) + 1)]
+
+class ScoreRanks:
+    """Order statistics over every stored score, one Fenwick tree per mode.
+
+    A snapshot with the per-score counts and the id of the last score it
+    includes is saved next to the database. Starting up loads the snapshot
+    and only reads scores added after it.
+    """
+
+    def __init__(self, snapshot_path):
+        self.snapshot_path = snapshot_path
+        self.modes = {}
+        self.last_id = 0
+        self._lock = threading.Lock()
+
+    def tree(self, game_mode):
+        """Fenwick tree of a mode, created empty on first use."""
+        if game_mode not in self.modes:
+            self.modes[game_mode] = FenwickCounts()
+        return self.modes[game_mode]
+
+    def add_rows(self, rows):
+        """Record (id, mode, score) rows that are newer than the snapshot."""
+        with self._lock:
+            for row_id, game_mode, score in rows:
+                if row_id > self.last_id:
+                    self.tree(game_mode).add(score)
+                    self.last_id = row_id
+
+    def rank(self, game_mode, score):
+        """(rank, percentile, total) of a score among all games of a mode."""
+        with self._lock:
+            tree = self.tree(game_mode)
+            return tree.rank(score), tree.percentile(score), tree.total
+
+    def top(self, game_mode, k):
+        """The k highest scores of a mode, best first."""
+        with self._lock:
+            return self.tree(game_mode).top(k)
+
+    def load(self):
+        """Load the saved snapshot. Returns False if there is none."""
+        try:
+            with np.load(self.snapshot_path) as snapshot:
+                last_id = int(snapshot["last_id"])
+                modes = {key[len("mode_"):]: FenwickCounts.from_counts(snapshot[key])
+                         for key in snapshot.files if key.startswith("mode_")}
+        except (OSError, ValueError, KeyError):
+            return False
+        with self._lock:
+            self.modes = modes
+            self.last_id = last_id
+        return True
+
+    def save(self):
+        """Write the snapshot atomically."""
+        with self._lock:
+            arrays = {f"mode_{mode}": tree.counts() for mode, tree in self.modes.items()}
+            arrays["last_id"] = np.array(self.last_id)
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, self.snapshot_path)
@@ -0,0 +1,225 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from game.score_ranks import FenwickCounts, ScoreRanks
+from utils.config import SCORE_STORE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    mode TEXT NOT NULL,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    time REAL NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_mode_score ON scores (mode, score DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Columns of a score row, in table order
+COLUMNS = ("player", "score", "attempts", "time", "date")
+
+class ScoreStore:
+    """Leaderboard scores in SQLite, safe for concurrent sessions.
+
+    The database runs in WAL mode, so readers never block the writer, and
+    top-N queries walk the (mode, score) index. New scores are buffered
+    and written in one transaction per batch: when `batch_size` scores are
+    pending, `flush_seconds` after the first pending score, or before any
+    read. An existing scores.json is imported once on first use.
+
+    Ranks and percentiles come from in-memory Fenwick trees over every
+    stored score, warm-loaded from a snapshot saved every
+    `snapshot_every` new scores and on close.
+    """
+
+    def __init__(self, db_path, legacy_json=None, batch_size=32, flush_seconds=1.0,
+                 snapshot_path=None, snapshot_every=1000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.snapshot_every = snapshot_every
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        self._pending = []
+        self._timer = None
+        self._lock = threading.RLock()
+
+        if legacy_json:
+            self.migrate_json(legacy_json)
+
+        self.ranks = ScoreRanks(snapshot_path or os.path.splitext(db_path)[0] + "_ranks.npz")
+        self._unsaved = 0
+        self._load_ranks()
+
+    def _load_ranks(self):
+        """Warm-load the rank snapshot, or build it from the database once."""
+        max_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM scores").fetchone()[0]
+        if self.ranks.load() and self.ranks.last_id <= max_id:
+            self._catch_up()
+            return
+
+        # No usable snapshot, count every score once with the (mode, score) index
+        counts = {}
+        for game_mode, score, count in self._conn.execute(
+                "SELECT mode, MAX(score, 0), COUNT(*) FROM scores WHERE id <= ? GROUP BY mode, score",
+                (max_id,)):
+            counts.setdefault(game_mode, []).append((score, count))
+        modes = {}
+        for game_mode, pairs in counts.items():
+            size = 1024
+            while size <= max(score for score, _ in pairs):
+                size *= 2
+            array = np.zeros(size, dtype=np.int64)
+            for score, count in pairs:
+                array[score] += count
+            modes[game_mode] = FenwickCounts.from_counts(array)
+        self.ranks.modes = modes
+        self.ranks.last_id = max_id
+        self.ranks.save()
+
+    def _catch_up(self):
+        """Add scores written since the ranks were last updated, by any process."""
+        rows = self._conn.execute(
+            "SELECT id, mode, score FROM scores WHERE id > ? ORDER BY id", (self.ranks.last_id,)
+        ).fetchall()
+        self.ranks.add_rows(rows)
+        self._unsaved += len(rows)
+        if self._unsaved >= self.snapshot_every:
+            self.ranks.save()
+            self._unsaved = 0
+
+    def migrate_json(self, json_path):
+        """Import a scores.json written by the old ScoreManager, once."""
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path) as f:
+                scores = json.load(f)
+        except (OSError, ValueError):
+            scores = {}
+
+        rows = [
+            (mode, entry.get("player", ""), int(entry.get("score", 0)), int(entry.get("attempts", 0)),
+             float(entry.get("time", 0)), entry.get("date", ""))
+            for mode, entries in scores.items() for entry in entries
+        ]
+        with self._lock:
+            # Take the write lock before checking the flag, so that only one
+            # of several server processes starting together imports the file
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+                    self._conn.rollback()
+                    return 0
+                self._conn.executemany(
+                    "INSERT INTO scores (mode, player, score, attempts, time, date) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)",
+                                   (os.path.abspath(json_path),))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            return len(rows)
+
+    def add(self, game_mode, player_name, score, attempts, time_taken, date=None):
+        """Queue a score to be written with the next batch."""
+        row = (game_mode, player_name, int(score), int(attempts), float(time_taken),
+               date or time.strftime("%Y-%m-%d %H:%M:%S"))
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                # Make sure a lone score does not wait for the next batch forever
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write all pending scores in one transaction."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+            rows, self._pending = self._pending, []
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO scores (mode, player, score, attempts, time, date) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            self._catch_up()
+            return len(rows)
+
+    def top(self, game_mode, limit=10):
+        """Highest scores of a game mode, as dicts like the old scores.json entries."""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT player, score, attempts, time, date FROM scores "
+                "WHERE mode = ? ORDER BY score DESC LIMIT ?",
+                (game_mode, limit)
+            ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def rank(self, game_mode, score):
+        """(rank, percentile, total) of a score among every game of a mode."""
+        with self._lock:
+            self.flush()
+            self._catch_up()
+        return self.ranks.rank(game_mode, score)
+
+    def count(self, game_mode=None):
+        """Number of stored scores, for one mode or overall."""
+        with self._lock:
+            self.flush()
+            if game_mode is None:
+                return self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM scores WHERE mode = ?", (game_mode,)).fetchone()[0]
+
+    def close(self):
+        """Write pending scores and close the database."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self.ranks.save()
+            self._conn.close()
+            self._conn = None
+
+_score_store = None
+_score_store_lock = threading.Lock()
+
+def get_score_store():
+    """Get the process-wide score store."""
+    global _score_store
+    with _score_store_lock:
+        if _score_store is None:
+            _score_store = ScoreStore(
+                SCORE_STORE["db"],
+                legacy_json=SCORE_STORE["legacy_json"],
+                batch_size=SCORE_STORE["batch_size"],
+                flush_seconds=SCORE_STORE["flush_seconds"],
+                snapshot_path=SCORE_STORE["ranks_snapshot"],
+                snapshot_every=SCORE_STORE["snapshot_every"]
+            )
+            atexit.register(_score_store.close)
+        return _score_store
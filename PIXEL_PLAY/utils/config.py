@@ -1,5 +1,16 @@
+import os
+
 # Game modes available
-GAME_MODES = ["8x8", "16x16", "24x24"]
+GAME_MODES = ["8x8", "16x16", "24x24", "48x48", "64x64"]
+
+# Number of missing tiles for each game mode
+MISSING_TILES = {
+    "8x8": 3,
+    "16x16": 7,
+    "24x24": 10,
+    "48x48": 24,
+    "64x64": 40
+}
 
 # Game title
 TITLE = "🧩 Puzzle Tiles Game"
@@ -21,6 +32,8 @@ In this game, you'll solve a puzzle by placing missing tiles back in their corre
 - **8x8**: Easy mode with 3 missing tiles
 - **16x16**: Medium mode with 7 missing tiles
 - **24x24**: Hard mode with 10 missing tiles
+- **48x48**: Expert mode with 24 missing tiles
+- **64x64**: Master mode with 40 missing tiles
 
 Select a mode below to begin:
 """
@@ -34,9 +47,18 @@ FEEDBACK = {
 
 # Camera configuration
 CAMERA_CONFIG = {
+    # Webcam index, or a video file, image directory/glob or .jsonl landmark
+    # trace to run without a webcam
+    "source": 0,
     "width": 640,
     "height": 480,
-    "fps": 30
+    "fps": 30,  # Target frame rate for capture and display
+    # Share one camera between server processes through a broker process
+    # publishing frames to shared memory, instead of a camera per process
+    "broker": False,
+    "broker_name": "pixel_play_camera",  # Shared memory segment name
+    "broker_slots": 4,  # Frames kept in the ring before a slow reader's frame is overwritten and dropped
+    "broker_idle_seconds": 60  # Broker exits after this long without readers
 }
 
 # Hand tracking configuration
@@ -44,7 +66,77 @@ HAND_TRACKING = {
     "min_detection_confidence": 0.5,
     "min_tracking_confidence": 0.5,
     "max_num_hands": 1,
-    "pinch_threshold": 0.05  # Distance threshold for pinch detection
+    "pinch_threshold": 0.05,  # Distance threshold for pinch detection
+    "adaptive": True,  # Skip inference on a still hand
+    "stable_threshold": 0.004,  # Max normalized landmark motion for a hand to count as still
+    "max_skipped_frames": 1  # Frames reused in a row while the hand is still
+}
+
+# Puzzle image library
+IMAGE_LIBRARY = {
+    "dir": os.path.join("assets", "images"),
+    "manifest": os.path.join("assets", "cache", "library.json"),  # Indexed dimensions, hashes and thumbnails
+    "thumbnail_dir": os.path.join("assets", "cache", "thumbnails"),
+    "thumbnail_size": (128, 128),
+    "recent_games": 10,  # Images not chosen again for this many games, if others are available
+    "aspect_ratio": None,  # Only choose images with this width / height, None for any
+    "aspect_tolerance": 0.15
+}
+
+# Background puzzle generation
+PUZZLE_POOL = {
+    "depth": 2,  # Ready puzzles kept for each game mode
+    "low_watermark": 1,  # Refill a mode once it has this many puzzles or fewer
+    "workers": 1,  # Background generator threads
+    "nice": 10  # Priority decrease of the generator threads, so the camera stays smooth
+}
+
+# Preprocessed puzzle image cache
+IMAGE_CACHE = {
+    "dir": os.path.join("assets", "cache", "images"),  # Memory-mapped .npy files
+    "memory_entries": 16,  # Images kept decoded in memory
+    "target_size": (800, 800)  # Board size puzzle images are letterboxed to
+}
+
+# Rendering configuration
+RENDER_CONFIG = {
+    "format": "jpeg",  # Encoding for board and tile images: "jpeg", "webp" or "png"
+    "quality": 85,  # Encoder quality from 0 to 100
+    "cache_mb": 64,  # Size limit of the encoded image cache shared by all sessions
+    "board_buffers": 32,  # Board images kept for active games across all sessions
+    "board_levels": [600, 400, 250],  # Smaller board widths kept next to the full board
+    "display_width": None,  # Board column width in pixels, None for full size (overridden by ?width=)
+    "min_slot_size": 32,  # Smallest tray tile size when the tray is scaled down with the board
+    "feedback_seconds": 1.0  # How long placement feedback stays on the board
+}
+
+# Tile tray atlas configuration
+TRAY_CONFIG = {
+    "max_rows": 5,  # Slots per column before the tray wraps into another column
+    "slot_size": 128,  # Tile size in the atlas in pixels
+    "padding": 8,  # Space around each tile in pixels
+    "label_height": 20  # Space for the tile label under each tile
+}
+
+# Timing instrumentation and metrics export
+METRICS = {
+    "enabled": True,
+    "instance": os.environ.get("PIXEL_PLAY_INSTANCE"),  # Kiosk name in exported metrics, None for the host name
+    "path": os.path.join("assets", "metrics", "metrics.prom"),  # None to keep metrics in memory only
+    "format": "prometheus",  # "prometheus" text file or "jsonl" snapshots
+    "dump_seconds": 10,  # Minimum time between metric dumps
+    "profile_every": 0,  # Run cProfile on one in every N reruns, 0 to disable
+    "profile_dir": os.path.join("assets", "metrics", "profiles")
+}
+
+# Leaderboard storage
+SCORE_STORE = {
+    "db": os.path.join("assets", "scores.db"),  # SQLite database in WAL mode
+    "legacy_json": os.path.join("assets", "scores.json"),  # Imported once if it exists
+    "batch_size": 32,  # Scores written per transaction
+    "flush_seconds": 1.0,  # Longest a score waits for its batch
+    "ranks_snapshot": os.path.join("assets", "scores_ranks.npz"),  # Warm-loaded rank counts
+    "snapshot_every": 1000  # New scores between rank snapshot saves
 }
 
 # Scoring configuration
@@ -0,0 +1,194 @@
+import cProfile
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+from utils.config import METRICS
+
+# Quantiles exported for every span
+QUANTILES = (0.5, 0.9, 0.99)
+
+class SpanStats:
+    """Count, total and a rolling window of durations for one named span."""
+
+    def __init__(self, window=1024):
+        self.count = 0
+        self.total = 0.0
+        self.durations = deque(maxlen=window)
+
+    def observe(self, duration):
+        self.count += 1
+        self.total += duration
+        self.durations.append(duration)
+
+    def quantile(self, q):
+        """Duration quantile in seconds over the rolling window."""
+        if not self.durations:
+            return 0.0
+        return float(np.quantile(np.fromiter(self.durations, dtype=np.float64), q))
+
+class Metrics:
+    """Process-wide spans and counters for the game loop.
+
+    Spans time named stages (`with metrics.span("inference"):`) and
+    counters count events. Both are cheap enough to leave on in
+    production. `dump` writes everything in Prometheus text format or as
+    one JSON line, and `rerun` wraps a Streamlit rerun, optionally running
+    cProfile on one in every `profile_every` reruns.
+    """
+
+    def __init__(self, instance=None, path=None, output_format="prometheus", dump_seconds=10.0,
+                 profile_every=0, profile_dir=None, enabled=True):
+        self.instance = instance or socket.gethostname()
+        self.path = path
+        self.output_format = output_format
+        self.dump_seconds = dump_seconds
+        self.profile_every = profile_every
+        self.profile_dir = profile_dir
+        self.enabled = enabled
+
+        self.spans = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._last_dump = time.monotonic()
+
+    def observe(self, name, duration):
+        """Record one duration in seconds for a span."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats()
+            stats.observe(duration)
+
+    @contextmanager
+    def span(self, name):
+        """Time the body of a with-block as one observation of `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def increment(self, name, value=1):
+        """Add to a counter."""
+        if not self.enabled or not value:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def rerun(self):
+        """Count and time a Streamlit rerun, profiling it if it is sampled."""
+        self.increment("reruns")
+        with self._lock:
+            rerun_number = self.counters.get("reruns", 0)
+
+        profiler = None
+        if self.enabled and self.profile_every and rerun_number % self.profile_every == 0:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            # st.rerun() and st.stop() raise, the span and profile are still recorded
+            with self.span("rerun"):
+                yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._save_profile(profiler, rerun_number)
+            self.maybe_dump()
+
+    def _save_profile(self, profiler, rerun_number):
+        """Write a sampled rerun profile, readable with pstats or snakeviz."""
+        profile_dir = self.profile_dir or "."
+        os.makedirs(profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(profile_dir, f"rerun_{int(time.time())}_{rerun_number}.prof"))
+
+    def snapshot(self):
+        """Current counters and span statistics as plain data."""
+        with self._lock:
+            spans = {
+                name: {
+                    "count": stats.count,
+                    "sum_seconds": stats.total,
+                    **{f"p{int(q * 100)}_seconds": stats.quantile(q) for q in QUANTILES},
+                }
+                for name, stats in self.spans.items()
+            }
+            counters = dict(self.counters)
+        return {"time": time.time(), "instance": self.instance, "counters": counters, "spans": spans}
+
+    def to_prometheus(self):
+        """Metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        instance = snapshot["instance"]
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"pixel_play_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f'{metric}{{instance="{instance}"}} {value}')
+
+        if snapshot["spans"]:
+            lines.append("# TYPE pixel_play_span_seconds summary")
+        for name, stats in sorted(snapshot["spans"].items()):
+            labels = f'instance="{instance}",span="{name}"'
+            for q in QUANTILES:
+                value = stats[f"p{int(q * 100)}_seconds"]
+                lines.append(f'pixel_play_span_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f"pixel_play_span_seconds_sum{{{labels}}} {stats['sum_seconds']:.6f}")
+            lines.append(f"pixel_play_span_seconds_count{{{labels}}} {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=None):
+        """Write the metrics to a local file.
+
+        Prometheus text replaces the file, for a node exporter textfile
+        collector. JSON lines appends one snapshot per dump.
+        """
+        path = path or self.path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self.output_format == "jsonl":
+            with open(path, 'a') as f:
+                f.write(json.dumps(self.snapshot()) + "\n")
+        else:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+
+    def maybe_dump(self):
+        """Dump the metrics if `dump_seconds` have passed since the last dump."""
+        if not self.enabled or not self.path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_dump < self.dump_seconds:
+                return
+            self._last_dump = now
+        self.dump()
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Get the process-wide metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(
+                instance=METRICS["instance"],
+                path=METRICS["path"],
+                output_format=METRICS["format"],
+                dump_seconds=METRICS["dump_seconds"],
+                profile_every=METRICS["profile_every"],
+                profile_dir=METRICS["profile_dir"],
+                enabled=METRICS["enabled"]
+            )
+        return _metrics
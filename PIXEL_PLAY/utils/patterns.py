@@ -0,0 +1,152 @@
+"""Procedural pattern images computed with coordinate-grid array math.
+
+Every pattern is defined on the 800x800 layout of the original sample
+images and scaled to any output size. Run as a script to write a large
+synthetic image set for load tests:
+
+    python -m utils.patterns assets/images --count 1000 --size 1024
+"""
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Side of the layout the pattern constants were designed for
+BASE_SIZE = 800
+
+def _grid(width, height):
+    """Pixel coordinates scaled to the base layout, and their offsets from the center."""
+    scale = BASE_SIZE / min(width, height)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float64)
+    x *= scale
+    y *= scale
+    dx = x - width * scale / 2
+    dy = y - height * scale / 2
+    return x, y, dx, dy
+
+def _channels(blue, green, red):
+    """Stack float channels into a BGR image, truncating like int() and clipping."""
+    img = np.empty(blue.shape + (3,), dtype=np.uint8)
+    for i, channel in enumerate((blue, green, red)):
+        img[..., i] = np.clip(np.trunc(channel), 0, 255)
+    return img
+
+def _two_colors(mask, first, second):
+    """BGR image that is `first` where mask is set and `second` elsewhere."""
+    return np.where(mask[..., np.newaxis], np.array(first, np.uint8), np.array(second, np.uint8))
+
+def radial(width, height, rng):
+    """Radial gradient."""
+    _, _, dx, dy = _grid(width, height)
+    distance = np.sqrt(dx**2 + dy**2)
+    return _channels(255 - distance * 0.5, distance * 0.5, 128 + np.sin(distance * 0.05) * 127)
+
+def wave(width, height, rng):
+    """Horizontal gradient with waves."""
+    x, y, _, _ = _grid(width, height)
+    return _channels(x / 3, 255 - x / 3, 128 + np.sin(y * 0.05) * 127)
+
+def checker(width, height, rng):
+    """Checkerboard pattern."""
+    x, y, _, _ = _grid(width, height)
+    check_size = 50
+    mask = (x // check_size + y // check_size) % 2 == 0
+    return _two_colors(mask, (50, 50, 200), (200, 200, 50))
+
+def spiral(width, height, rng):
+    """Spiral pattern."""
+    _, _, dx, dy = _grid(width, height)
+    angle = np.arctan2(dy, dx)
+    distance = np.sqrt(dx**2 + dy**2)
+    turn = (angle + distance * 0.01) % (2 * np.pi) / (2 * np.pi)
+    return _channels(turn * 255, (1 - turn) * 255, np.sin(turn * np.pi) * 255)
+
+def concentric(width, height, rng):
+    """Concentric circles."""
+    _, _, dx, dy = _grid(width, height)
+    distance = np.sqrt(dx**2 + dy**2)
+    return _two_colors(distance.astype(np.int64) % 50 < 25, (50, 150, 255), (255, 150, 50))
+
+def diagonal(width, height, rng):
+    """Diagonal stripes in random colors."""
+    x, y, _, _ = _grid(width, height)
+    colors = rng.integers(0, 256, size=(4, 3), dtype=np.uint8)
+    stripe = ((x + y) // 60).astype(np.int64) % len(colors)
+    return colors[stripe]
+
+def plasma(width, height, rng):
+    """Sum of sine waves at random frequencies and phases."""
+    x, y, dx, dy = _grid(width, height)
+    freq = rng.uniform(0.005, 0.03, size=3)
+    phase = rng.uniform(0, 2 * np.pi, size=3)
+    value = (np.sin(x * freq[0] + phase[0]) + np.sin(y * freq[1] + phase[1])
+             + np.sin(np.sqrt(dx**2 + dy**2) * freq[2] + phase[2])) / 3
+    return _channels(128 + value * 127, 128 + np.sin(value * np.pi) * 127, 128 - value * 127)
+
+def noise(width, height, rng):
+    """Smooth random color noise."""
+    import cv2
+    coarse = rng.integers(0, 256, size=(8, 8, 3), dtype=np.uint8)
+    return cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC)
+
+# Pattern generators by name, each called as fn(width, height, rng)
+PATTERNS = {
+    "radial": radial,
+    "wave": wave,
+    "checker": checker,
+    "spiral": spiral,
+    "concentric": concentric,
+    "diagonal": diagonal,
+    "plasma": plasma,
+    "noise": noise,
+}
+
+def render_pattern(name, size=(800, 800), seed=0):
+    """Render one pattern as a BGR image of the given (width, height)."""
+    if name not in PATTERNS:
+        raise ValueError(f"Unknown pattern: {name}")
+    width, height = size
+    return PATTERNS[name](width, height, np.random.default_rng(seed))
+
+def generate_patterns(specs, workers=None):
+    """Render many (name, size, seed) specs in parallel, in order.
+
+    numpy and OpenCV release the GIL for the heavy array work, so a thread
+    pool scales across cores.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda spec: render_pattern(*spec), specs))
+
+def write_pattern_images(directory, count, size=(800, 800), names=None, prefix="pattern",
+                         seed=0, workers=None):
+    """Render `count` images cycling through the patterns and write them as JPEG files."""
+    import cv2
+    names = list(names or PATTERNS)
+    os.makedirs(directory, exist_ok=True)
+
+    def write(i):
+        img = render_pattern(names[i % len(names)], size, seed + i)
+        path = os.path.join(directory, f"{prefix}_{i + 1}.jpg")
+        cv2.imwrite(path, img)
+        return path
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(write, range(count)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="where to write the images")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--size", type=int, default=800, help="image width and height in pixels")
+    parser.add_argument("--patterns", nargs="+", choices=sorted(PATTERNS), help="patterns to cycle through")
+    parser.add_argument("--prefix", default="pattern")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    paths = write_pattern_images(args.directory, args.count, (args.size, args.size), args.patterns,
+                                 args.prefix, args.seed, args.workers)
+    print(f"Wrote {len(paths)} images to {args.directory}")
+
+if __name__ == "__main__":
+    main()